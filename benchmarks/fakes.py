@@ -0,0 +1,360 @@
+# /bot/benchmarks/fakes.py
+"""Stand-ins for the Discord objects and the MongoDB database the benchmarked cogs touch.
+
+They only implement what the cogs actually use, and every network call returns right away,
+so the benchmarks measure the bot's own code.
+"""
+import copy
+import itertools
+import discord
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+
+ids = itertools.count(10_000_000)
+
+def next_id():
+    return next(ids)
+
+# ----- MongoDB -----
+
+OPERATORS = {
+    "$gt": lambda value, target: value is not None and value > target,
+    "$gte": lambda value, target: value is not None and value >= target,
+    "$lt": lambda value, target: value is not None and value < target,
+    "$lte": lambda value, target: value is not None and value <= target,
+    "$ne": lambda value, target: value != target,
+    "$in": lambda value, target: value in target,
+}
+
+def matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            for op, target in condition.items():
+                if op == "$exists":
+                    if (key in doc) != target:
+                        return False
+                elif not OPERATORS[op](value, target):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        return self.iterate()
+
+    async def iterate(self):
+        for doc in self.docs:
+            yield doc
+
+    async def to_list(self, length=None):
+        return self.docs if length is None else self.docs[:length]
+
+class FakeResult:
+    def __init__(self, matched_count=0, inserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = matched_count
+        self.deleted_count = matched_count
+        self.inserted_id = inserted_id
+
+class FakeCollection:
+    """In-memory collection with the subset of the async pymongo API the cogs use."""
+
+    def __init__(self):
+        self.docs = []
+        self.ids = itertools.count(1)
+
+    async def find_one(self, query=None):
+        for doc in self.docs:
+            if matches(doc, query or {}):
+                return copy.deepcopy(doc)
+        return None
+
+    def find(self, query=None):
+        return FakeCursor([copy.deepcopy(doc) for doc in self.docs if matches(doc, query or {})])
+
+    async def insert_one(self, doc):
+        doc = copy.deepcopy(doc)
+        doc.setdefault("_id", next(self.ids))
+        self.docs.append(doc)
+        return FakeResult(inserted_id=doc["_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        for doc in self.docs:
+            if matches(doc, query):
+                apply_update(doc, update)
+                return FakeResult(matched_count=1)
+        if upsert:
+            doc = {key: value for key, value in query.items()}
+            apply_update(doc, update)
+            await self.insert_one(doc)
+        return FakeResult()
+
+    async def delete_one(self, query):
+        for index, doc in enumerate(self.docs):
+            if matches(doc, query):
+                del self.docs[index]
+                return FakeResult(matched_count=1)
+        return FakeResult()
+
+    async def delete_many(self, query):
+        before = len(self.docs)
+        self.docs = [doc for doc in self.docs if not matches(doc, query)]
+        return FakeResult(matched_count=before - len(self.docs))
+
+    async def replace_one(self, query, replacement, upsert=False):
+        for index, doc in enumerate(self.docs):
+            if matches(doc, query):
+                self.docs[index] = {"_id": doc["_id"], **copy.deepcopy(replacement)}
+                return FakeResult(matched_count=1)
+        if upsert:
+            await self.insert_one({**{key: value for key, value in query.items()}, **replacement})
+        return FakeResult()
+
+    async def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            if isinstance(request, ReplaceOne):
+                await self.replace_one(request._filter, request._doc, upsert=request._upsert)
+            elif isinstance(request, UpdateOne):
+                await self.update_one(request._filter, request._doc, upsert=bool(request._upsert))
+            elif isinstance(request, DeleteOne):
+                await self.delete_one(request._filter)
+            else:
+                raise NotImplementedError(type(request).__name__)
+
+    async def count_documents(self, query):
+        return sum(1 for doc in self.docs if matches(doc, query))
+
+    async def create_index(self, *args, **kwargs):
+        return "index"
+
+def apply_update(doc, update):
+    for operator, fields in update.items():
+        for key, value in fields.items():
+            if operator == "$set":
+                doc[key] = copy.deepcopy(value)
+            elif operator == "$inc":
+                doc[key] = doc.get(key, 0) + value
+            elif operator == "$push":
+                doc.setdefault(key, []).append(copy.deepcopy(value))
+            elif operator == "$pull":
+                doc[key] = [item for item in doc.get(key, []) if item != value]
+            elif operator == "$unset":
+                doc.pop(key, None)
+            else:
+                raise NotImplementedError(operator)
+
+class FakeDatabase:
+    """Same interface as utils.database.Database (`bot.db.<collection>`), backed by FakeCollections."""
+
+    def __init__(self):
+        self.collections = {}
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def __getitem__(self, collection_name):
+        if collection_name not in self.collections:
+            self.collections[collection_name] = FakeCollection()
+        return self.collections[collection_name]
+
+    def __getattr__(self, collection_name):
+        if collection_name.startswith("_"):
+            raise AttributeError(collection_name)
+        return self[collection_name]
+
+# ----- Discord -----
+
+class FakeAsset:
+    def __init__(self, url):
+        self.url = url
+
+class FakePermissions:
+    def __init__(self, **permissions):
+        self.permissions = permissions
+
+    def __getattr__(self, name):
+        return self.permissions.get(name, True)
+
+class FakeMember:
+    def __init__(self, guild=None, name=None, bot=False, top_role=1, **permissions):
+        self.id = next_id()
+        self.name = name or f"member{self.id}"
+        self.display_name = self.name
+        self.mention = f"<@{self.id}>"
+        self.bot = bot
+        self.guild = guild
+        self.top_role = top_role
+        self.guild_permissions = FakePermissions(**permissions)
+        self.avatar = FakeAsset(f"https://cdn.example.com/avatars/{self.id}.png")
+        self.display_avatar = self.avatar
+        self.voice = None
+        self.sent = 0
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    def __hash__(self):
+        return self.id
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+
+    async def kick(self, reason=None):
+        pass
+
+class FakeChannel:
+    def __init__(self, guild=None):
+        self.id = next_id()
+        self.guild = guild
+        self.sent = 0
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+        return FakeMessage(self)
+
+class FakeVoiceChannel(FakeChannel):
+    async def connect(self):
+        self.guild.voice_client = FakeVoiceClient(self)
+        return self.guild.voice_client
+
+class FakeVoiceClient:
+    def __init__(self, channel):
+        self.channel = channel
+        self.source = None
+        self.after = None
+        self.playing = False
+        self.paused = False
+
+    def is_playing(self):
+        return self.playing
+
+    def is_paused(self):
+        return self.paused
+
+    def is_connected(self):
+        return True
+
+    def play(self, source, after=None):
+        self.source, self.after, self.playing = source, after, True
+
+    def stop(self):
+        self.playing = self.paused = False
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    async def move_to(self, channel):
+        self.channel = channel
+
+    async def disconnect(self, force=False):
+        self.channel.guild.voice_client = None
+
+class FakeGuild:
+    def __init__(self, member_count=250):
+        self.id = next_id()
+        self.name = f"guild{self.id}"
+        self.member_count = member_count
+        self.owner = FakeMember(self, name="owner", top_role=100)
+        self.owner_id = self.owner.id
+        self.voice_client = None
+
+class FakeAttachment:
+    def __init__(self, url="https://cdn.example.com/image.png", content_type="image/png", size=50_000):
+        self.url = url
+        self.content_type = content_type
+        self.size = size
+
+class FakeResponse:
+    def __init__(self):
+        self.done = False
+        self.sent = 0
+
+    def is_done(self):
+        return self.done
+
+    async def defer(self, *args, **kwargs):
+        self.done = True
+
+    async def send_message(self, *args, **kwargs):
+        if self.done:
+            raise discord.InteractionResponded(None)
+        self.done = True
+        self.sent += 1
+
+    async def edit_message(self, *args, **kwargs):
+        self.done = True
+
+class FakeMessage:
+    def __init__(self, channel=None):
+        self.id = next_id()
+        self.channel = channel
+        self.edits = 0
+
+    async def edit(self, *args, **kwargs):
+        self.edits += 1
+        return self
+
+    async def delete(self):
+        pass
+
+class FakeFollowup:
+    def __init__(self):
+        self.sent = 0
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+        return FakeMessage()
+
+class FakeInteraction:
+    """Just enough of discord.Interaction for a command callback to run."""
+
+    def __init__(self, client, user, guild, channel=None, command_name=None):
+        self.client = client
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id if guild else None
+        self.channel = channel or FakeChannel(guild)
+        self.command = type("FakeCommand", (), {"name": command_name, "qualified_name": command_name})() if command_name else None
+        self.created_at = discord.utils.utcnow()
+        self.extras = {}
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+
+class FakeBot:
+    """What the cogs reach through `self.bot`: db, the disabled command cache, the loop and other cogs."""
+
+    def __init__(self, db, loop):
+        from utils.disabled_commands import DisabledCommands
+
+        self.db = db
+        self.disabled_commands = DisabledCommands(db)
+        self.loop = loop
+        self.user = FakeMember(name="Slavie", bot=True)
+        self.cogs = {}
+        self.views = []
+        self.latency = 0.05
+
+    def add_view(self, view, message_id=None):
+        self.views.append(view)
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+    def get_guild(self, guild_id):
+        return None
+
+    def is_ready(self):
+        return False
+
+    async def add_cog(self, cog):
+        self.cogs[type(cog).__name__] = cog
@@ -0,0 +1,167 @@
+# /bot/benchmarks/run.py
+"""Offline benchmarks for slash command handlers.
+
+Runs the real cog callbacks against fake interactions, an in-memory database and stubbed external services,
+and reports throughput and latency per command. Run from the bot folder:
+
+    python -m benchmarks.run                  # everything
+    python -m benchmarks.run warn marry -n 2000
+"""
+import argparse
+import asyncio
+import time
+from contextlib import ExitStack
+from types import SimpleNamespace
+from benchmarks.fakes import FakeAttachment, FakeBot, FakeDatabase, FakeGuild, FakeInteraction, FakeMember, FakeVoiceChannel
+from benchmarks.stubs import import_cog, stub_services
+
+BENCHMARKS = {}
+
+def benchmark(name, module, cog_class):
+    """Register a benchmark. The decorated function gets (cog, bot) and returns `async def op(i)`."""
+    def decorator(func):
+        BENCHMARKS[name] = (module, cog_class, func)
+        return func
+    return decorator
+
+@benchmark("warn", "cogs.Moderation.Warn", "WarnCog")
+def warn(cog, bot):
+    guild = FakeGuild()
+    moderator = FakeMember(guild, top_role=50)
+    members = [FakeMember(guild) for _ in range(25)]
+
+    async def op(i):
+        interaction = FakeInteraction(bot, moderator, guild, command_name="warn")
+        await cog.warn_interaction.callback(cog, interaction, members[i % len(members)], "Benchmark")
+    return op
+
+def play_op(cog, bot, query):
+    async def op(i):
+        # A fresh guild each time, so every run joins, queues and starts playback
+        guild = FakeGuild()
+        user = FakeMember(guild)
+        user.voice = SimpleNamespace(channel=FakeVoiceChannel(guild))
+        interaction = FakeInteraction(bot, user, guild, command_name="play")
+        await cog.play.callback(cog, interaction, query=query)
+        # Spotify links are imported in the background, wait for the whole import
+        spotify_import = cog.player(guild.id).import_task
+        if spotify_import:
+            await spotify_import
+    return op
+
+@benchmark("play", "cogs.Music.Play", "Play")
+def play(cog, bot):
+    return play_op(cog, bot, "never gonna give you up")
+
+@benchmark("play_spotify", "cogs.Music.Play", "Play")
+def play_spotify(cog, bot):
+    return play_op(cog, bot, "https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M")
+
+@benchmark("play_playlist", "cogs.Music.Play", "Play")
+def play_playlist(cog, bot):
+    return play_op(cog, bot, "https://www.youtube.com/playlist?list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI")
+
+@benchmark("caption", "cogs.Other.Caption", "CaptionCog")
+def caption(cog, bot):
+    guild = FakeGuild()
+    user = FakeMember(guild)
+
+    async def op(i):
+        interaction = FakeInteraction(bot, user, guild, command_name="caption")
+        await cog.caption.callback(cog, interaction, FakeAttachment(), "when the benchmark finally runs offline")
+    return op
+
+@benchmark("marry", "cogs.Interactions.Marry", "MarryCommand")
+def marry(cog, bot):
+    guild = FakeGuild()
+
+    async def op(i):
+        # New couple every time so the full proposal path runs
+        proposer, recipient = FakeMember(guild), FakeMember(guild)
+        interaction = FakeInteraction(bot, proposer, guild, command_name="marry")
+        await cog.marry_interaction.callback(cog, interaction, recipient)
+    return op
+
+@benchmark("disable", "cogs.Moderation.DisableCmds", "CommandManager")
+def disable(cog, bot):
+    names = ["hug", "kiss", "play", "warn", "music", "moderation", "interactions", "other"]
+    guilds = {}
+
+    async def op(i):
+        # Each guild disables every name once, covering insert, update and already-disabled paths
+        index = i // len(names)
+        if index not in guilds:
+            guilds[index] = FakeGuild()
+        guild = guilds[index]
+        interaction = FakeInteraction(bot, guild.owner, guild, command_name="disable")
+        await cog.disable_command.callback(cog, interaction, names[i % len(names)])
+    return op
+
+def percentile(sorted_values, q):
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+async def run_benchmark(name, iterations, warmup):
+    module_name, cog_class, make_op = BENCHMARKS[name]
+    module, error = import_cog(module_name)
+    if module is None:
+        return {"name": name, "skipped": error}
+
+    bot = FakeBot(FakeDatabase(), asyncio.get_running_loop())
+    cog = getattr(module, cog_class)(bot)
+    await bot.add_cog(cog)
+    if hasattr(cog, "cog_load"):
+        await cog.cog_load()
+
+    with ExitStack() as stack:
+        stub_services(stack)
+        op = make_op(cog, bot)
+        for i in range(warmup):
+            await op(i)
+
+        latencies = []
+        started = time.perf_counter()
+        for i in range(warmup, warmup + iterations):
+            op_started = time.perf_counter()
+            await op(i)
+            latencies.append(time.perf_counter() - op_started)
+        total = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "name": name,
+        "ops_per_sec": iterations / total,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "max": latencies[-1],
+    }
+
+def format_results(results):
+    lines = [f"{'Benchmark':<14} {'ops/sec':>10} {'p50':>10} {'p99':>10} {'max':>10}"]
+    for result in results:
+        if "skipped" in result:
+            lines.append(f"{result['name']:<14} skipped: {result['skipped']}")
+            continue
+        lines.append(
+            f"{result['name']:<14} {result['ops_per_sec']:>10.0f} {result['p50'] * 1000:>8.3f}ms "
+            f"{result['p99'] * 1000:>8.3f}ms {result['max'] * 1000:>8.3f}ms"
+        )
+    return "\n".join(lines)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark slash command handlers offline.")
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("-n", "--iterations", type=int, default=500, help="Measured runs per benchmark")
+    parser.add_argument("-w", "--warmup", type=int, default=20, help="Unmeasured runs before measuring")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+    results = []
+    for name in args.names or BENCHMARKS:
+        results.append(await run_benchmark(name, args.iterations, args.warmup))
+    print(format_results(results))
+
+if __name__ == "__main__":
+    asyncio.run(main())
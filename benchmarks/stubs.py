@@ -0,0 +1,155 @@
+# /bot/benchmarks/stubs.py
+"""Canned responses for Tenor, Spotify, yt-dlp, image downloads and FFmpeg, so no benchmark touches the network."""
+import importlib
+import io
+import sys
+from types import SimpleNamespace
+from unittest import mock
+import discord
+
+TENOR_RESULTS = {
+    "results": [{"media_formats": {"gif": {"url": f"https://media.tenor.com/fake{index}.gif"}}} for index in range(50)]
+}
+
+class FakeHttpResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+def fake_requests_get(url, *args, **kwargs):
+    return FakeHttpResponse(TENOR_RESULTS)
+
+class FakeYoutubeDL:
+    def __init__(self, options=None):
+        self.options = options
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, query, download=False):
+        if self.options and self.options.get("extract_flat"):
+            # Flat playlist listing: metadata only, no stream URLs
+            entries = [
+                {"id": f"vid{index:08}", "title": f"Playlist Song {index}", "duration": 180 + index, "channel": "Fake Channel"}
+                for index in range(200)
+            ]
+            return {"entries": entries}
+        title = query.removeprefix("ytsearch:")
+        video = {
+            "id": "dQw4w9WgXcQ",
+            "url": "https://rr1---sn.googlevideo.com/videoplayback?fake=1",
+            "title": title,
+            "duration": 212,
+            "thumbnail": "https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg",
+            "acodec": "opus",
+        }
+        return {"entries": [video]}
+
+class FakeSpotify:
+    def __init__(self, tracks=25):
+        self.tracks = tracks
+
+    def track(self, link):
+        return {"id": "faketrack", "name": "Fake Track", "artists": [{"name": "Fake Artist"}], "duration_ms": 212_000}
+
+    def playlist_items(self, link, *args, **kwargs):
+        items = [
+            {"track": {"id": f"faketrack{index}", "name": f"Fake Track {index}", "artists": [{"name": "Fake Artist"}], "duration_ms": 212_000}}
+            for index in range(self.tracks)
+        ]
+        return {"items": items, "total": self.tracks, "next": None}
+
+    def next(self, page):
+        return None
+
+class FakeAudioSource(discord.AudioSource):
+    """Replaces FFmpegPCMAudio and FFmpegOpusAudio, FFmpeg isn't started at all."""
+
+    def __init__(self, source, *args, **kwargs):
+        self.source = source
+
+    def read(self):
+        return b"\x00" * 3840
+
+    def is_opus(self):
+        return False
+
+    def cleanup(self):
+        pass
+
+class FakeOpusSource(FakeAudioSource):
+    def read(self):
+        return b"\xf8\xff\xfe"  # An Opus silence frame
+
+    def is_opus(self):
+        return True
+
+def make_png(width=800, height=600):
+    from PIL import Image
+
+    with io.BytesIO() as buffer:
+        Image.new("RGB", (width, height), (200, 120, 180)).save(buffer, "PNG")
+        return buffer.getvalue()
+
+class FakeDownload:
+    def __init__(self, body):
+        self.status = 200
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        return self.body
+
+class FakeClientSession:
+    body = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, url, *args, **kwargs):
+        if FakeClientSession.body is None:
+            FakeClientSession.body = make_png()
+        return FakeDownload(FakeClientSession.body)
+
+def stub_services(stack):
+    """Patch every external service the benchmarked cogs call. `stack` is a contextlib.ExitStack that undoes it."""
+    fake_requests = SimpleNamespace(get=fake_requests_get)
+    for name in ("cogs.Interactions.Marry", "cogs.Interactions.Hug", "cogs.Interactions.Kiss",
+                 "cogs.Interactions.slap", "cogs.Interactions.Adopt"):
+        module = sys.modules.get(name)
+        if module is not None:
+            stack.enter_context(mock.patch.object(module, "requests", fake_requests))
+
+    music_utils = sys.modules.get("cogs.Music.Music_utils")
+    if music_utils is not None:
+        stack.enter_context(mock.patch.object(music_utils, "youtube_dl", SimpleNamespace(YoutubeDL=FakeYoutubeDL)))
+        stack.enter_context(mock.patch.object(music_utils, "spotify", FakeSpotify()))
+
+    caption = sys.modules.get("cogs.Other.Caption")
+    if caption is not None:
+        stack.enter_context(mock.patch.object(caption, "aiohttp", SimpleNamespace(ClientSession=FakeClientSession)))
+
+    stack.enter_context(mock.patch.object(discord, "FFmpegPCMAudio", FakeAudioSource))
+    stack.enter_context(mock.patch.object(discord, "FFmpegOpusAudio", FakeOpusSource))
+
+def import_cog(name):
+    """Import a cog module, or return the reason it can't be imported here (usually a missing dependency)."""
+    try:
+        return importlib.import_module(name), None
+    except ImportError as e:
+        return None, str(e)
@@ -18,6 +18,10 @@ class HibernateCog(commands.Cog):
     @commands.command()
     @commands.is_owner()
     async def hibernate(self, ctx):
+        play_cog = self.bot.get_cog('Play')
+        if play_cog:
+            # Save the music queues so they resume after the hibernate
+            await play_cog.save_all_sessions()
         await ctx.send("Hibernate successful")
         await os.system("shutdown /h")
 
@@ -0,0 +1,48 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+from utils.metrics import metrics
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    if seconds == float("inf"):
+        return ">30s"
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.1f}s"
+
+class MetricsCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name="metrics", description="Show command and external call metrics (bot owner only).")
+    async def metrics_command(self, interaction: discord.Interaction):
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message("Only the bot owner can see the metrics.", ephemeral=True)
+            return
+
+        commands_summary = sorted(metrics.command_summary().items(), key=lambda item: item[1][0] + item[1][1], reverse=True)
+        lines = [f"{'Command':<16} {'Calls':>6} {'Errors':>6} {'p50':>7} {'p99':>7}"]
+        for name, (calls, errors, histogram) in commands_summary[:15]:
+            lines.append(f"{name[:16]:<16} {calls:>6} {errors:>6} {format_seconds(histogram.quantile(0.5)):>7} {format_seconds(histogram.quantile(0.99)):>7}")
+        if not commands_summary:
+            lines.append("No commands used yet")
+
+        lines.append("")
+        lines.append(f"{'Service':<16} {'Calls':>6} {'Errors':>6} {'avg':>7} {'p99':>7}")
+        external = sorted(metrics.external_summary().items())
+        for service, (histogram, errors) in external:
+            average = histogram.sum / histogram.count if histogram.count else None
+            lines.append(f"{service:<16} {histogram.count:>6} {errors:>6} {format_seconds(average):>7} {format_seconds(histogram.quantile(0.99)):>7}")
+        if not external:
+            lines.append("No external calls yet")
+
+        embed = discord.Embed(
+            title="📊 Bot Metrics",
+            description="```\n" + "\n".join(lines)[:4000] + "\n```",
+            color=0xE6E6FA
+        )
+        embed.set_footer(text=f"Gateway latency: {self.bot.latency * 1000:.0f}ms | Latencies are bucket upper bounds")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(MetricsCog(bot))
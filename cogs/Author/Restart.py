@@ -18,6 +18,10 @@ class RestartCog(commands.Cog):
     @commands.command()
     @commands.is_owner()
     async def restart(self, ctx):
+        play_cog = self.bot.get_cog('Play')
+        if play_cog:
+            # Save the music queues so they resume after the restart
+            await play_cog.save_all_sessions()
         await ctx.send("Restart successful")
         await os.system("shutdown /r /t 0")
 
@@ -0,0 +1,49 @@
+import discord
+from discord.ext import commands
+
+class StallsCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command()
+    @commands.is_owner()
+    async def stalls(self, ctx, index: int = None):
+        """Show what blocked the event loop recently. `stalls <n>` shows the stack of the n-th latest stall."""
+        watchdog = self.bot.loop_watchdog
+        stalls = list(watchdog.stalls)
+
+        if index is not None:
+            if not 1 <= index <= len(stalls):
+                await ctx.send(f"There are only {len(stalls)} recorded stalls.")
+                return
+            stall = stalls[-index]
+            where = f"{stall['cog']}:{stall['function']}" if stall["cog"] else "unknown (not in a cog)"
+            stack = "".join(stall["stack"]) or "No stack captured"
+            header = f"{stall['duration'] * 1000:.0f} ms in {where} at {stall['when']:%Y-%m-%d %H:%M:%S} UTC\n\n"
+            # Keep the innermost frames if the stack is too long for one message
+            await ctx.send(f"```\n{header}{stack[-(1990 - len(header)):]}\n```")
+            return
+
+        lines = [
+            f"Current lag: {watchdog.lag * 1000:.0f} ms, worst: {watchdog.max_lag * 1000:.0f} ms",
+            f"Stalls over {watchdog.threshold * 1000:.0f} ms: {watchdog.total_stalls}",
+        ]
+        if stalls:
+            lines.append("")
+            lines.append("By location (count, total, worst):")
+            for where, (count, total, worst) in watchdog.summary():
+                lines.append(f"  {where}: {count}x, {total * 1000:.0f} ms, {worst * 1000:.0f} ms")
+            lines.append("")
+            lines.append("Latest:")
+            for number, stall in enumerate(reversed(stalls[-5:]), start=1):
+                where = f"{stall['cog']}:{stall['function']}" if stall["cog"] else "unknown"
+                lines.append(f"  {number}. {stall['duration'] * 1000:.0f} ms in {where}")
+        await ctx.send("```\n" + "\n".join(lines)[:1990] + "\n```")
+
+    @stalls.error
+    async def stalls_error(self, ctx, error):
+        if isinstance(error, commands.NotOwner):
+            await ctx.send("Only the bot owner can see event loop stalls.")
+
+async def setup(bot):
+    await bot.add_cog(StallsCog(bot))
@@ -0,0 +1,24 @@
+import discord
+from discord.ext import commands
+
+class SyncCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command()
+    @commands.is_owner()
+    async def sync(self, ctx):
+        """Force a global slash command sync, even if the command tree looks unchanged."""
+        try:
+            synced = await self.bot.command_sync.sync(force=True)
+            await ctx.send(f"Synced {len(synced)} commands globally")
+        except discord.HTTPException as e:
+            await ctx.send(f"An error with syncing application commands has occurred: {e}")
+
+    @sync.error
+    async def sync_error(self, ctx, error):
+        if isinstance(error, commands.NotOwner):
+            await ctx.send("Only the bot owner can sync commands.")
+
+async def setup(bot):
+    await bot.add_cog(SyncCog(bot))
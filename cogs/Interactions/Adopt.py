@@ -4,34 +4,24 @@ from discord import app_commands
 from discord.ext import commands
 import random
 import requests
-from pymongo import MongoClient
 from bson.objectid import ObjectId
 from dotenv import load_dotenv
+from utils.disabled_commands import check_if_disabled
+from utils.metrics import metrics
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Retrieve environment variables
-MONGODB_URI = os.getenv("MONGODB_URI")  # MongoDB connection string
-DATABASE_NAME = "Slavie"  # As specified by the user
 TENOR_API_KEY = os.getenv("TENOR_API_KEY")  # Tenor API Key
 LIMIT = 1000
 
-# Initialize MongoDB client
-client = MongoClient(MONGODB_URI)
-db = client[DATABASE_NAME]
-
-# Define collections
-adoptions_col = db.adoptions
-pending_adoptions_col = db.pending_adoptions
-marriages_col = db.marriages
-disabled_commands_col = db.disabled_commands
-
 def get_gif(search_term):
     """Fetch a random GIF from the Tenor API based on a search term."""
-    response = requests.get(
-        f"https://tenor.googleapis.com/v2/search?q={search_term}&key={TENOR_API_KEY}&client_key=my_test_app&limit={LIMIT}"
-    )
+    with metrics.timer("tenor"):
+        response = requests.get(
+            f"https://tenor.googleapis.com/v2/search?q={search_term}&key={TENOR_API_KEY}&client_key=my_test_app&limit={LIMIT}"
+        )
     if response.status_code == 200:
         gifs = response.json().get('results', [])
         if gifs:
@@ -39,20 +29,6 @@ def get_gif(search_term):
             return selected_gif['media_formats']['gif']['url']
     return None
 
-# Custom check function to disable commands
-def check_if_disabled():
-    async def predicate(interaction: discord.Interaction) -> bool:
-        guild_id = str(interaction.guild.id)
-        command_name = interaction.command.name
-        disabled_commands = disabled_commands_col.find_one({"guild_id": guild_id})
-        if disabled_commands and command_name in disabled_commands.get("commands", []):
-            await interaction.response.send_message(
-                f"The command `{command_name}` is disabled in this server.", ephemeral=True
-            )
-            return False  # Prevents the slash command from executing
-        return True
-    return app_commands.check(predicate)
-
 class AdoptionView(discord.ui.View):
     """View for handling adoption acceptance or rejection."""
     def __init__(self, adopter_id, adoptee_id):
@@ -66,7 +42,7 @@ class AdoptionView(discord.ui.View):
             await interaction.response.send_message(f"{interaction.user.mention} has accepted the adoption! 🎉")
             
             # Update adoptions
-            marriage = marriages_col.find_one({"user_id": self.adopter_id})
+            marriage = await interaction.client.db.marriages.find_one({"user_id": self.adopter_id})
             spouse_id = marriage["married_to"] if marriage else None
 
             adoption_doc = {
@@ -74,10 +50,10 @@ class AdoptionView(discord.ui.View):
                 "adopted_by": self.adopter_id,
                 "spouse_id": spouse_id
             }
-            adoptions_col.insert_one(adoption_doc)
+            await interaction.client.db.adoptions.insert_one(adoption_doc)
 
             # Remove from pending adoptions
-            pending_adoptions_col.delete_one({"adopter_id": self.adopter_id, "adoptee_id": self.adoptee_id})
+            await interaction.client.db.pending_adoptions.delete_one({"adopter_id": self.adopter_id, "adoptee_id": self.adoptee_id})
         else:
             await interaction.response.send_message("This adoption proposal was not meant for you!", ephemeral=True)
 
@@ -86,7 +62,7 @@ class AdoptionView(discord.ui.View):
         if str(interaction.user.id) == self.adoptee_id:
             await interaction.response.send_message(f"{interaction.user.mention} has declined the adoption.")
             # Remove from pending adoptions
-            pending_adoptions_col.delete_one({"adopter_id": self.adopter_id, "adoptee_id": self.adoptee_id})
+            await interaction.client.db.pending_adoptions.delete_one({"adopter_id": self.adopter_id, "adoptee_id": self.adoptee_id})
         else:
             await interaction.response.send_message("This adoption proposal was not meant for you!", ephemeral=True)
 
@@ -95,16 +71,16 @@ class AdoptionCommand(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    def get_spouse_id(self, user_id):
+    async def get_spouse_id(self, user_id):
         """Get the spouse ID of a user."""
-        marriage = marriages_col.find_one({"user_id": user_id})
+        marriage = await self.bot.db.marriages.find_one({"user_id": user_id})
         return marriage["married_to"] if marriage else None
 
-    def is_family(self, user1_id, user2_id):
+    async def is_family(self, user1_id, user2_id):
         """Check if two users are related (parent-child, siblings, etc.)."""
         # Parent-child relationship
-        adoption1 = adoptions_col.find_one({"user_id": user1_id})
-        adoption2 = adoptions_col.find_one({"user_id": user2_id})
+        adoption1 = await self.bot.db.adoptions.find_one({"user_id": user1_id})
+        adoption2 = await self.bot.db.adoptions.find_one({"user_id": user2_id})
         if adoption1 and adoption1["adopted_by"] == user2_id:
             return True
         if adoption2 and adoption2["adopted_by"] == user1_id:
@@ -119,8 +95,8 @@ class AdoptionCommand(commands.Cog):
             adopter1 = adoption1.get("adopted_by")
             adopter2 = adoption2.get("adopted_by")
             if adopter1 and adopter2:
-                grandparent1 = adoptions_col.find_one({"user_id": adopter1})
-                grandparent2 = adoptions_col.find_one({"user_id": adopter2})
+                grandparent1 = await self.bot.db.adoptions.find_one({"user_id": adopter1})
+                grandparent2 = await self.bot.db.adoptions.find_one({"user_id": adopter2})
                 if grandparent1 and grandparent2:
                     return True  # Assuming they share a grandparent
                 if adopter1 == adopter2:
@@ -139,21 +115,21 @@ class AdoptionCommand(commands.Cog):
             return
 
         # Check if the adopter is trying to adopt their spouse
-        adopter_spouse_id = self.get_spouse_id(str(interaction.user.id))
+        adopter_spouse_id = await self.get_spouse_id(str(interaction.user.id))
         if adopter_spouse_id and adopter_spouse_id == str(member.id):
             await interaction.response.send_message("You can't adopt your spouse!", ephemeral=True)
             return
 
         # Check if the adopter is trying to adopt their child's spouse
-        adopted_children = adoptions_col.find({"adopted_by": str(interaction.user.id)})
-        for child in adopted_children:
-            child_spouse_id = self.get_spouse_id(child["user_id"])
+        adopted_children = self.bot.db.adoptions.find({"adopted_by": str(interaction.user.id)})
+        async for child in adopted_children:
+            child_spouse_id = await self.get_spouse_id(child["user_id"])
             if child_spouse_id == str(member.id):
                 await interaction.response.send_message("You can't adopt your child's spouse!", ephemeral=True)
                 return
 
         # Check for family relationship restrictions (parents, grandparents, aunts, uncles, etc.)
-        if self.is_family(str(interaction.user.id), str(member.id)):
+        if await self.is_family(str(interaction.user.id), str(member.id)):
             await interaction.response.send_message(
                 "You cannot adopt someone who is already your family (parents, siblings, grandparents, etc.).",
                 ephemeral=True
@@ -161,7 +137,7 @@ class AdoptionCommand(commands.Cog):
             return
 
         # Check if the adopter has a pending proposal to the same member
-        pending = pending_adoptions_col.find_one({
+        pending = await self.bot.db.pending_adoptions.find_one({
             "adopter_id": str(interaction.user.id),
             "adoptee_id": str(member.id)
         })
@@ -186,7 +162,7 @@ class AdoptionCommand(commands.Cog):
             await interaction.response.send_message(embed=embed, view=view)
 
             # Store the pending adoption proposal
-            pending_adoptions_col.insert_one({
+            await self.bot.db.pending_adoptions.insert_one({
                 "adopter_id": str(interaction.user.id),
                 "adoptee_id": str(member.id)
             })
@@ -202,13 +178,13 @@ class AdoptionCommand(commands.Cog):
     async def cancel_adoption_interaction(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
 
-        pending = pending_adoptions_col.find_one({"adopter_id": user_id})
+        pending = await self.bot.db.pending_adoptions.find_one({"adopter_id": user_id})
         if not pending:
             await interaction.response.send_message("You have no pending adoptions to cancel.", ephemeral=True)
             return
 
-        pending_adoptions_col.delete_one({"adopter_id": user_id})
-        pending_adoptions_col.delete_one({"adoptee_id": user_id})  # Remove reciprocal entry if any
+        await self.bot.db.pending_adoptions.delete_one({"adopter_id": user_id})
+        await self.bot.db.pending_adoptions.delete_one({"adoptee_id": user_id})  # Remove reciprocal entry if any
 
         await interaction.response.send_message(
             "Your adoption proposal has been successfully canceled.",
@@ -223,9 +199,9 @@ class AdoptionCommand(commands.Cog):
         member_id = str(member.id)
 
         # Check if the member is adopted by the user
-        adoption = adoptions_col.find_one({"user_id": member_id, "adopted_by": user_id})
+        adoption = await self.bot.db.adoptions.find_one({"user_id": member_id, "adopted_by": user_id})
         if adoption:
-            adoptions_col.delete_one({"_id": adoption["_id"]})
+            await self.bot.db.adoptions.delete_one({"_id": adoption["_id"]})
             
             # Fetch a kick GIF
             abandon_gif = get_gif("anime+kick")
@@ -248,9 +224,9 @@ class AdoptionCommand(commands.Cog):
         user_id = str(interaction.user.id)
 
         # Check if the user is adopted
-        adoption = adoptions_col.find_one({"user_id": user_id})
+        adoption = await self.bot.db.adoptions.find_one({"user_id": user_id})
         if adoption:
-            adoptions_col.delete_one({"_id": adoption["_id"]})
+            await self.bot.db.adoptions.delete_one({"_id": adoption["_id"]})
             
             # Fetch a runaway GIF
             runaway_gif = get_gif("anime+runaway")
@@ -6,35 +6,27 @@ from discord.ext import commands
 from discord import app_commands
 import requests
 import random
-from pymongo import MongoClient
 from dotenv import load_dotenv
+from utils.disabled_commands import check_if_disabled
+from utils.metrics import metrics
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Retrieve environment variables
 TENOR_API_KEY = os.getenv("TENOR_API_KEY")
-MONGODB_URI = os.getenv("MONGODB_URI")
 
 LIMIT = 1000  # Increase limit to get multiple results for more randomness
 
-# Initialize MongoDB client
-client = MongoClient(MONGODB_URI)
-db = client["Slavie"]  # Database name
-
-# Define collections
-marriages_col = db.marriages
-proposals_col = db.proposals
-disabled_commands_col = db.disabled_commands
-
 def get_hug_gif(warm_hug=False):
     """Fetch a random hug GIF from Tenor API."""
     # Different search terms based on hug type
     search_term = "anime+warm+hug" if warm_hug else "anime+friendly+hug"
     
-    response = requests.get(
-        f"https://tenor.googleapis.com/v2/search?q={search_term}&key={TENOR_API_KEY}&client_key=my_test_app&limit={LIMIT}"
-    )
+    with metrics.timer("tenor"):
+        response = requests.get(
+            f"https://tenor.googleapis.com/v2/search?q={search_term}&key={TENOR_API_KEY}&client_key=my_test_app&limit={LIMIT}"
+        )
     
     if response.status_code == 200:
         gifs = response.json().get('results', [])
@@ -43,24 +35,6 @@ def get_hug_gif(warm_hug=False):
             return random.choice(gifs)['media_formats']['gif']['url']
     return None
 
-async def is_command_disabled(guild_id, command_name):
-    """Check if a command is disabled for a specific guild."""
-    disabled_commands = disabled_commands_col.find_one({"guild_id": str(guild_id)})
-    if disabled_commands and command_name in disabled_commands.get("commands", []):
-        return True
-    return False
-
-# Custom check function to disable commands
-def check_if_disabled():
-    async def predicate(interaction: discord.Interaction) -> bool:
-        guild_id = interaction.guild.id
-        command_name = interaction.command.name
-        if await is_command_disabled(guild_id, command_name):
-            await interaction.response.send_message(f"The command `{command_name}` is disabled in this server.", ephemeral=True)
-            return False  # Prevents the slash command from executing
-        return True
-    return app_commands.check(predicate)
-
 class HugCommand(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -82,19 +56,19 @@ class HugCommand(commands.Cog):
         member_id = str(member.id)
 
         # Check if the user has proposed to someone but they haven't accepted yet
-        proposal = proposals_col.find_one({"proposer_id": user_id, "recipient_id": member_id})
+        proposal = await self.bot.db.proposals.find_one({"proposer_id": user_id, "recipient_id": member_id})
         if proposal:
             await interaction.response.send_message("They haven't accepted your proposal yet! Be patient.", ephemeral=True)
             return
 
         # Check if the user has a pending proposal to someone else
-        existing_proposal = proposals_col.find_one({"proposer_id": user_id})
+        existing_proposal = await self.bot.db.proposals.find_one({"proposer_id": user_id})
         if existing_proposal:
             await interaction.response.send_message("You already proposed to someone! Wait until they either accept or decline.", ephemeral=True)
             return
 
         # Check if the member being hugged has a pending proposal from someone else
-        member_proposal = proposals_col.find_one({"recipient_id": member_id, "proposer_id": {"$ne": user_id}})
+        member_proposal = await self.bot.db.proposals.find_one({"recipient_id": member_id, "proposer_id": {"$ne": user_id}})
         if member_proposal:
             proposer = self.bot.get_user(int(member_proposal["proposer_id"]))
             if proposer:
@@ -104,7 +78,7 @@ class HugCommand(commands.Cog):
             return
 
         # Check if the hug initiator is married to someone else
-        marriage = marriages_col.find_one({"user_id": user_id})
+        marriage = await self.bot.db.marriages.find_one({"user_id": user_id})
         if marriage and marriage.get("married_to") != member_id:
             # Random responses for cheating message
             cheating_responses = [
@@ -121,13 +95,13 @@ class HugCommand(commands.Cog):
             return
 
         # Check if the member being hugged is married to someone else
-        member_marriage = marriages_col.find_one({"user_id": member_id})
+        member_marriage = await self.bot.db.marriages.find_one({"user_id": member_id})
         if member_marriage and member_marriage.get("married_to") != user_id:
             await interaction.response.send_message(f"{member.mention} is married and can only be hugged by their spouse!", ephemeral=True)
             return
 
         # Check if the member being hugged has a pending proposal (and you're not married)
-        if proposals_col.find_one({"recipient_id": member_id}) and not (marriages_col.find_one({"user_id": user_id}) or marriages_col.find_one({"user_id": member_id})):
+        if await self.bot.db.proposals.find_one({"recipient_id": member_id}) and not (await self.bot.db.marriages.find_one({"user_id": user_id}) or await self.bot.db.marriages.find_one({"user_id": member_id})):
             await interaction.response.send_message(f"{member.mention} has already proposed to someone else. You shouldn't hug them right now!", ephemeral=True)
             return
 
@@ -6,42 +6,25 @@ from discord.ext import commands
 from discord import app_commands
 import random
 import requests
-from pymongo import MongoClient, ASCENDING
+from pymongo import ASCENDING
 from dotenv import load_dotenv
+from utils.disabled_commands import check_if_disabled
+from utils.metrics import metrics
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Retrieve environment variables
-MONGODB_URI = os.getenv("MONGODB_URI")
-DATABASE_NAME = "Slavie"
 TENOR_API_KEY = os.getenv("TENOR_API_KEY")
 
-# Initialize MongoDB client
-client = MongoClient(MONGODB_URI)
-db = client[DATABASE_NAME]
-
-# Define collections
-marriages_col = db.marriages
-proposals_col = db.proposals
-adoptions_col = db.adoptions
-disabled_commands_col = db.disabled_commands
-
-# Ensure unique constraints
-marriages_col.create_index("user_id", unique=True)
-proposals_col.create_index(
-    [("proposer_id", ASCENDING), ("recipient_id", ASCENDING)],
-    unique=True
-)
-proposals_col.create_index("recipient_id", unique=True, partialFilterExpression={"recipient_id": {"$exists": True}})
-
 LIMIT = 1000
 
 def get_propose_gif():
     search_term = "anime+proposal"
-    response = requests.get(
-        f"https://tenor.googleapis.com/v2/search?q={search_term}&key={TENOR_API_KEY}&client_key=my_test_app&limit={LIMIT}"
-    )
+    with metrics.timer("tenor"):
+        response = requests.get(
+            f"https://tenor.googleapis.com/v2/search?q={search_term}&key={TENOR_API_KEY}&client_key=my_test_app&limit={LIMIT}"
+        )
     if response.status_code == 200:
         gifs = response.json().get('results', [])
         if gifs:
@@ -49,20 +32,20 @@ def get_propose_gif():
             return selected_gif['media_formats']['gif']['url']
     return None
 
-def are_siblings(user1_id, user2_id):
-    adoptions1 = adoptions_col.find_one({"user_id": str(user1_id)})
-    adoptions2 = adoptions_col.find_one({"user_id": str(user2_id)})
+async def are_siblings(db, user1_id, user2_id):
+    adoptions1 = await db.adoptions.find_one({"user_id": str(user1_id)})
+    adoptions2 = await db.adoptions.find_one({"user_id": str(user2_id)})
     if adoptions1 and adoptions2:
         return adoptions1.get("siblings") == adoptions2.get("siblings")
     return False
 
-def are_related(user1_id, user2_id):
-    adoptions1 = adoptions_col.find_one({"user_id": str(user1_id)})
-    adoptions2 = adoptions_col.find_one({"user_id": str(user2_id)})
+async def are_related(db, user1_id, user2_id):
+    adoptions1 = await db.adoptions.find_one({"user_id": str(user1_id)})
+    adoptions2 = await db.adoptions.find_one({"user_id": str(user2_id)})
 
     if adoptions1 and adoptions2:
         # Check for sibling relationship
-        if are_siblings(user1_id, user2_id):
+        if await are_siblings(db, user1_id, user2_id):
             return True
         # Check for parent-child relationship
         if adoptions1.get("children") == adoptions2.get("children"):
@@ -78,19 +61,6 @@ def are_related(user1_id, user2_id):
             return True
     return False
 
-def check_if_disabled():
-    async def predicate(interaction: discord.Interaction) -> bool:
-        guild_id = str(interaction.guild.id)
-        command_name = interaction.command.name
-        disabled_commands = disabled_commands_col.find_one({"guild_id": guild_id})
-        if disabled_commands and command_name in disabled_commands.get("commands", []):
-            await interaction.response.send_message(
-                f"The command `{command_name}` is disabled in this server.", ephemeral=True
-            )
-            return False
-        return True
-    return app_commands.check(predicate)
-
 class ProposalView(discord.ui.View):
     def __init__(self, proposer_id, recipient_id):
         super().__init__(timeout=None)
@@ -106,16 +76,16 @@ class ProposalView(discord.ui.View):
             )
             try:
                 # Create marriages
-                marriages_col.insert_one({
+                await interaction.client.db.marriages.insert_one({
                     "user_id": str(interaction.user.id),
                     "married_to": str(proposer_id)
                 })
-                marriages_col.insert_one({
+                await interaction.client.db.marriages.insert_one({
                     "user_id": str(proposer_id),
                     "married_to": str(interaction.user.id)
                 })
                 # Remove proposal
-                proposals_col.delete_one({
+                await interaction.client.db.proposals.delete_one({
                     "proposer_id": str(proposer_id),
                     "recipient_id": str(interaction.user.id)
                 })
@@ -137,7 +107,7 @@ class ProposalView(discord.ui.View):
             )
             try:
                 # Remove proposal
-                proposals_col.delete_one({
+                await interaction.client.db.proposals.delete_one({
                     "proposer_id": str(proposer_id),
                     "recipient_id": str(interaction.user.id)
                 })
@@ -154,6 +124,15 @@ class MarryCommand(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        # Ensure unique constraints
+        await self.bot.db.marriages.create_index("user_id", unique=True)
+        await self.bot.db.proposals.create_index(
+            [("proposer_id", ASCENDING), ("recipient_id", ASCENDING)],
+            unique=True
+        )
+        await self.bot.db.proposals.create_index("recipient_id", unique=True, partialFilterExpression={"recipient_id": {"$exists": True}})
+
     @app_commands.command(name="marry", description="Propose marriage to someone")
     @check_if_disabled()
     async def marry_interaction(self, interaction: discord.Interaction, member: discord.Member):
@@ -166,22 +145,22 @@ class MarryCommand(commands.Cog):
             return
 
         # Check if the proposer is already married
-        if marriages_col.find_one({"user_id": str(interaction.user.id)}):
+        if await self.bot.db.marriages.find_one({"user_id": str(interaction.user.id)}):
             await interaction.response.send_message("You are already married!", ephemeral=False)
             return
 
         # Check if the recipient is already married
-        if marriages_col.find_one({"user_id": str(member.id)}):
+        if await self.bot.db.marriages.find_one({"user_id": str(member.id)}):
             await interaction.response.send_message("This person is already married!", ephemeral=False)
             return
 
         # Check for related relationships (sibling, parent, grandparent, aunt, uncle, child)
-        if are_related(interaction.user.id, member.id):
+        if await are_related(self.bot.db, interaction.user.id, member.id):
             await interaction.response.send_message("You cannot marry your relative!", ephemeral=False)
             return
 
         # Check if the proposer has any pending proposals
-        existing_proposal = proposals_col.find_one({"proposer_id": str(interaction.user.id)})
+        existing_proposal = await self.bot.db.proposals.find_one({"proposer_id": str(interaction.user.id)})
         if existing_proposal:
             await interaction.response.send_message(
                 "You already have a pending proposal! Wait for it to be accepted or declined before proposing again.",
@@ -190,7 +169,7 @@ class MarryCommand(commands.Cog):
             return
 
         # Check if the recipient has any pending proposals
-        recipient_proposal = proposals_col.find_one({"recipient_id": str(member.id)})
+        recipient_proposal = await self.bot.db.proposals.find_one({"recipient_id": str(member.id)})
         if recipient_proposal:
             await interaction.response.send_message(
                 f"{member.mention} already has a pending proposal! Wait for it to be accepted or declined.",
@@ -212,7 +191,7 @@ class MarryCommand(commands.Cog):
             await interaction.response.send_message(embed=embed, view=view)
 
             # Store the proposal
-            proposals_col.insert_one({
+            await self.bot.db.proposals.insert_one({
                 "proposer_id": str(interaction.user.id),
                 "recipient_id": str(member.id)
             })
@@ -227,21 +206,21 @@ class MarryCommand(commands.Cog):
     async def accept_interaction(self, interaction: discord.Interaction):
         try:
             # Find the proposal where recipient_id is the user
-            proposal = proposals_col.find_one({"recipient_id": str(interaction.user.id)})
+            proposal = await self.bot.db.proposals.find_one({"recipient_id": str(interaction.user.id)})
             if proposal:
                 proposer_id = proposal.get("proposer_id")
                 if proposer_id:
                     # Create marriages
-                    marriages_col.insert_one({
+                    await self.bot.db.marriages.insert_one({
                         "user_id": str(interaction.user.id),
                         "married_to": str(proposer_id)
                     })
-                    marriages_col.insert_one({
+                    await self.bot.db.marriages.insert_one({
                         "user_id": str(proposer_id),
                         "married_to": str(interaction.user.id)
                     })
                     # Remove proposal
-                    proposals_col.delete_one({
+                    await self.bot.db.proposals.delete_one({
                         "proposer_id": str(proposer_id),
                         "recipient_id": str(interaction.user.id)
                     })
@@ -261,12 +240,12 @@ class MarryCommand(commands.Cog):
     async def decline_interaction(self, interaction: discord.Interaction):
         try:
             # Find the proposal where recipient_id is the user
-            proposal = proposals_col.find_one({"recipient_id": str(interaction.user.id)})
+            proposal = await self.bot.db.proposals.find_one({"recipient_id": str(interaction.user.id)})
             if proposal:
                 proposer_id = proposal.get("proposer_id")
                 if proposer_id:
                     # Remove proposal
-                    proposals_col.delete_one({
+                    await self.bot.db.proposals.delete_one({
                         "proposer_id": str(proposer_id),
                         "recipient_id": str(interaction.user.id)
                     })
@@ -285,12 +264,12 @@ class MarryCommand(commands.Cog):
     @check_if_disabled()
     async def divorce_interaction(self, interaction: discord.Interaction):
         try:
-            marriage = marriages_col.find_one({"user_id": str(interaction.user.id)})
+            marriage = await self.bot.db.marriages.find_one({"user_id": str(interaction.user.id)})
             if marriage and marriage.get("married_to"):
                 spouse_id = marriage["married_to"]
                 # Remove both marriage entries
-                marriages_col.delete_one({"user_id": str(interaction.user.id)})
-                marriages_col.delete_one({"user_id": str(spouse_id)})
+                await self.bot.db.marriages.delete_one({"user_id": str(interaction.user.id)})
+                await self.bot.db.marriages.delete_one({"user_id": str(spouse_id)})
                 await interaction.response.send_message(
                     f"{interaction.user.mention} has divorced their spouse."
                 )
@@ -309,12 +288,12 @@ class MarryCommand(commands.Cog):
 
         try:
             # Find proposals initiated by the user
-            proposals = list(proposals_col.find({"proposer_id": user_id}))
+            proposals = await self.bot.db.proposals.find({"proposer_id": user_id}).to_list(None)
             if proposals:
                 for proposal in proposals:
                     recipient_id = proposal.get("recipient_id")
                     # Remove the proposal
-                    proposals_col.delete_one({
+                    await self.bot.db.proposals.delete_one({
                         "proposer_id": user_id,
                         "recipient_id": recipient_id
                     })
@@ -4,32 +4,24 @@ from discord.ext import commands
 import requests
 import os
 import random  # Import random for random selection
-from pymongo import MongoClient
 from dotenv import load_dotenv
+from utils.disabled_commands import check_if_disabled
+from utils.metrics import metrics
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Retrieve environment variables
 TENOR_API_KEY = os.getenv("TENOR_API_KEY")
-MONGODB_URI = os.getenv("MONGODB_URI")
 
 LIMIT = 1000  # Increased limit for fetching multiple GIFs
 
-# Initialize MongoDB client
-client = MongoClient(MONGODB_URI)
-db = client["Slavie"]  # Use the discord_bot database
-
-# Define collections
-marriages_col = db.marriages
-adoptions_col = db.adoptions
-disabled_commands_col = db.disabled_commands
-
 def get_slap_gif():
     """Fetch a random slap GIF from Tenor API."""
     search_term = "anime+slap"
     url = f"https://tenor.googleapis.com/v2/search?q={search_term}&key={TENOR_API_KEY}&limit={LIMIT}"
-    response = requests.get(url)
+    with metrics.timer("tenor"):
+        response = requests.get(url)
 
     if response.status_code == 200:
         gifs = response.json().get('results', [])
@@ -38,27 +30,9 @@ def get_slap_gif():
             return random.choice(gifs)['media_formats']['gif']['url']
     return None
 
-def is_command_disabled(guild_id, command_name):
-    """Check if a command is disabled for a specific guild."""
-    disabled_commands = disabled_commands_col.find_one({"guild_id": str(guild_id)})
-    if disabled_commands:
-        return command_name in disabled_commands.get("commands", [])
-    return False
-
-# Custom check function to disable commands
-def check_if_disabled():
-    async def predicate(interaction: discord.Interaction) -> bool:
-        guild_id = interaction.guild.id
-        command_name = interaction.command.name
-        if is_command_disabled(guild_id, command_name):
-            await interaction.response.send_message(f"The command `{command_name}` is disabled in this server.", ephemeral=True)
-            return False  # Prevents the slash command from executing
-        return True
-    return app_commands.check(predicate)
-
-def load_data(collection, user_id):
+async def load_data(collection, user_id):
     """Load data from a MongoDB collection for a given user."""
-    return collection.find_one({"user_id": str(user_id)})
+    return await collection.find_one({"user_id": str(user_id)})
 
 class SlapCommand(commands.Cog):
     def __init__(self, bot):
@@ -79,13 +53,13 @@ class SlapCommand(commands.Cog):
                 return
 
             # Check if the user is trying to slap their spouse
-            user_marriage = load_data(marriages_col, interaction.user.id)
+            user_marriage = await load_data(self.bot.db.marriages, interaction.user.id)
             if user_marriage and user_marriage.get("married_to") == str(member.id):
                 await interaction.response.send_message("Don't you dare lay a finger on your spouse!", ephemeral=False)
                 return
 
             # Check if the slapped member is an adopted child
-            member_adoption = load_data(adoptions_col, member.id)
+            member_adoption = await load_data(self.bot.db.adoptions, member.id)
             parent1, parent2 = None, None
             if member_adoption:
                 parent1_id = member_adoption.get("adopted_by")
@@ -100,7 +74,7 @@ class SlapCommand(commands.Cog):
                         return
 
             # Check if the slapped member is a parent of the user
-            user_adoption = load_data(adoptions_col, interaction.user.id)
+            user_adoption = await load_data(self.bot.db.adoptions, interaction.user.id)
             if user_adoption:
                 if (user_adoption.get("adopted_by") == str(member.id) or 
                     user_adoption.get("spouse_id") == str(member.id)):
@@ -120,7 +94,7 @@ class SlapCommand(commands.Cog):
 
             # Check if the slapped member is married
             spouse = None
-            member_marriage = load_data(marriages_col, member.id)
+            member_marriage = await load_data(self.bot.db.marriages, member.id)
             if member_marriage:
                 spouse_id = member_marriage.get("married_to")
                 spouse = self.bot.get_user(int(spouse_id))
@@ -136,7 +110,7 @@ class SlapCommand(commands.Cog):
                 embed.set_footer(text=f"{parent1.display_name} isn't gonna leave you alone on this one!")
 
             # Create the slap back button view
-            view = self.SlapBackButton(interaction.user, member, spouse, parent1, parent2, db)
+            view = self.SlapBackButton(interaction.user, member, spouse, parent1, parent2, self.bot.db)
 
             # Send the embed response with the slap back button
             await interaction.response.send_message(embed=embed, view=view)
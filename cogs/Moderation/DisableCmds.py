@@ -1,28 +1,11 @@
-import os
 import discord
 from discord.ext import commands
 from discord import app_commands
-from pymongo import MongoClient
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Retrieve environment variables
-MONGODB_URI = os.getenv("MONGODB_URI")
-DATABASE_NAME = "Slavie"
-
-# Initialize MongoDB client
-client = MongoClient(MONGODB_URI)
-db = client[DATABASE_NAME]
-
-# Define the disabled_commands collection
-disabled_commands_col = db.disabled_commands
 
 # Command categories
 MUSIC_COMMANDS = [
-    "join", "loop", "loopall", "move", "pause", "play", "resume",
-    "shuffle", "skip", "stop", "volume"
+    "filter", "join", "loop", "loopall", "move", "pause", "play", "resume",
+    "queuelimit", "seek", "shuffle", "skip", "stop", "volume"
 ]
 
 MODERATION_COMMANDS = [
@@ -48,12 +31,7 @@ class CommandManager(commands.Cog):
 
     async def is_command_disabled(self, guild_id: int, command_name: str) -> bool:
         """Check if a command is disabled for a specific guild."""
-        guild_id_str = str(guild_id)
-        command_name_lower = command_name.lower()
-        guild = disabled_commands_col.find_one({"guild_id": guild_id_str})
-        if guild and "commands" in guild:
-            return command_name_lower in guild["commands"]
-        return False
+        return self.bot.disabled_commands.is_disabled(guild_id, command_name.lower())
 
     @app_commands.command(name="disable", description="Disable a command or a group of commands for this guild.")
     @app_commands.checks.has_permissions(administrator=True)
@@ -75,9 +53,9 @@ class CommandManager(commands.Cog):
             commands_to_disable = [command_name_lower]
 
         # Fetch current disabled commands for the guild
-        guild = disabled_commands_col.find_one({"guild_id": guild_id_str})
+        guild = await self.bot.db.disabled_commands.find_one({"guild_id": guild_id_str})
         if not guild:
-            disabled_commands_col.insert_one({"guild_id": guild_id_str, "commands": []})
+            await self.bot.db.disabled_commands.insert_one({"guild_id": guild_id_str, "commands": []})
             guild = {"guild_id": guild_id_str, "commands": []}
 
         updated = False
@@ -87,10 +65,11 @@ class CommandManager(commands.Cog):
                 updated = True
 
         if updated:
-            disabled_commands_col.update_one(
+            await self.bot.db.disabled_commands.update_one(
                 {"guild_id": guild_id_str},
                 {"$set": {"commands": guild["commands"]}}
             )
+            self.bot.disabled_commands.set_commands(guild_id_str, guild["commands"])
             if command_name_lower in ["music", "moderation", "interactions", "other"]:
                 await interaction.response.send_message(f"All `{command_name_lower}` commands have been disabled.", ephemeral=False)
             else:
@@ -118,7 +97,7 @@ class CommandManager(commands.Cog):
             commands_to_enable = [command_name_lower]
 
         # Fetch current disabled commands for the guild
-        guild = disabled_commands_col.find_one({"guild_id": guild_id_str})
+        guild = await self.bot.db.disabled_commands.find_one({"guild_id": guild_id_str})
         if not guild:
             await interaction.response.send_message(f"No commands are disabled in this server.", ephemeral=False)
             return
@@ -131,12 +110,13 @@ class CommandManager(commands.Cog):
 
         if updated:
             if guild["commands"]:
-                disabled_commands_col.update_one(
+                await self.bot.db.disabled_commands.update_one(
                     {"guild_id": guild_id_str},
                     {"$set": {"commands": guild["commands"]}}
                 )
             else:
-                disabled_commands_col.delete_one({"guild_id": guild_id_str})
+                await self.bot.db.disabled_commands.delete_one({"guild_id": guild_id_str})
+            self.bot.disabled_commands.set_commands(guild_id_str, guild["commands"])
 
             if command_name_lower in ["music", "moderation", "interactions", "other"]:
                 await interaction.response.send_message(f"All `{command_name_lower}` commands have been enabled.", ephemeral=False)
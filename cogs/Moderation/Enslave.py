@@ -3,41 +3,13 @@ from discord.ext import commands, tasks
 from discord import app_commands
 from datetime import datetime, timedelta
 import os
-from pymongo import MongoClient
 from dotenv import load_dotenv
+from utils.disabled_commands import check_if_disabled
 
 # Load environment variables from .env file
 load_dotenv()
-MONGODB_URI = os.getenv("MONGODB_URI")
 GUILD_ID = os.getenv("GUILD_ID")  # Ensure GUILD_ID is set in your .env
 
-client = MongoClient(MONGODB_URI)
-db = client["Slavie"]  # Database name
-disabled_commands_col = db.disabled_commands
-enslaved_members_col = db.enslaved_members  # New collection for enslaved members
-
-def load_disabled_commands():
-    """Load the disabled commands from MongoDB."""
-    return disabled_commands_col.find_one({"guild_id": str(GUILD_ID)}) or {}
-
-async def is_command_disabled(guild_id, command_name):
-    """Check if a command is disabled for a specific guild."""
-    disabled_commands = disabled_commands_col.find_one({"guild_id": str(guild_id)})
-    return disabled_commands and command_name in disabled_commands.get("commands", [])
-
-# Custom check function to disable commands
-def check_if_disabled():
-    async def predicate(interaction: discord.Interaction) -> bool:
-        guild_id = interaction.guild.id
-        command_name = interaction.command.name
-        if await is_command_disabled(guild_id, command_name):
-            await interaction.response.send_message(
-                f"The command `{command_name}` is disabled in this server.", ephemeral=True
-            )
-            return False  # Prevents the slash command from executing
-        return True
-    return app_commands.check(predicate)
-
 class EnslaveCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -79,11 +51,11 @@ class EnslaveCog(commands.Cog):
 
         try:
             # Find all enslaved members whose timeout_end_time is <= current_time
-            expired_members = enslaved_members_col.find({
+            expired_members = self.bot.db.enslaved_members.find({
                 "timeout_end_time": {"$lte": current_time}
             })
 
-            for record in expired_members:
+            async for record in expired_members:
                 guild_id = int(record["guild_id"])
                 member_id = int(record["member_id"])
                 guild = self.bot.get_guild(guild_id)
@@ -95,7 +67,7 @@ class EnslaveCog(commands.Cog):
                 if not member:
                     print(f"Member with ID {member_id} not found in guild {guild_id}.")
                     # Optionally, remove the record if the member no longer exists
-                    enslaved_members_col.delete_one({"guild_id": str(guild_id), "member_id": str(member_id)})
+                    await self.bot.db.enslaved_members.delete_one({"guild_id": str(guild_id), "member_id": str(member_id)})
                     continue
 
                 # Check if the member still has the Slave role
@@ -107,7 +79,7 @@ class EnslaveCog(commands.Cog):
 
     async def unenslave_member(self, member: discord.Member, guild: discord.Guild):
         """Unenslave the member and restore their roles."""
-        record = enslaved_members_col.find_one({"guild_id": str(guild.id), "member_id": str(member.id)})
+        record = await self.bot.db.enslaved_members.find_one({"guild_id": str(guild.id), "member_id": str(member.id)})
         if not record:
             print(f"{member} is not enslaved.")
             return
@@ -130,7 +102,7 @@ class EnslaveCog(commands.Cog):
             print(f"{member} has been automatically unenslaved and roles restored.")
 
             # Remove the member's record from the database
-            enslaved_members_col.delete_one({"guild_id": str(guild.id), "member_id": str(member.id)})
+            await self.bot.db.enslaved_members.delete_one({"guild_id": str(guild.id), "member_id": str(member.id)})
         except discord.Forbidden:
             print(f"Failed to unenslave {member} due to insufficient permissions.")
         except discord.HTTPException as e:
@@ -184,7 +156,7 @@ class EnslaveCog(commands.Cog):
             await member.timeout(timeout_end_time)
 
             # Upsert the member's record in MongoDB
-            enslaved_members_col.update_one(
+            await self.bot.db.enslaved_members.update_one(
                 {"guild_id": str(interaction.guild.id), "member_id": str(member.id)},
                 {"$set": {
                     "roles": temp_roles,
@@ -228,7 +200,7 @@ class EnslaveCog(commands.Cog):
     async def unenslave(self, interaction: discord.Interaction, member: discord.Member):
         """Remove timeout and restore roles."""
         try:
-            record = enslaved_members_col.find_one({"guild_id": str(interaction.guild.id), "member_id": str(member.id)})
+            record = await self.bot.db.enslaved_members.find_one({"guild_id": str(interaction.guild.id), "member_id": str(member.id)})
 
             if not record:
                 await interaction.response.send_message(
@@ -253,7 +225,7 @@ class EnslaveCog(commands.Cog):
             await member.timeout(None)
 
             # Remove the member's record from the database
-            enslaved_members_col.delete_one({"guild_id": str(interaction.guild.id), "member_id": str(member.id)})
+            await self.bot.db.enslaved_members.delete_one({"guild_id": str(interaction.guild.id), "member_id": str(member.id)})
 
             await interaction.response.send_message(
                 f"{member.mention} has been unenslaved and roles restored.", 
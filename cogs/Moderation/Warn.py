@@ -1,51 +1,24 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import os
 from datetime import datetime
-from pymongo import MongoClient
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-MONGODB_URI = os.getenv("MONGODB_URI")
-
-client = MongoClient(MONGODB_URI)
-db = client["Slavie"]  # Database name
-disabled_commands_col = db.disabled_commands
-warn_data_col = db.warn_data
-
-async def is_command_disabled(guild_id, command_name):
-    """Check if a command is disabled for a specific guild."""
-    disabled_commands = disabled_commands_col.find_one({"guild_id": str(guild_id)})
-    return disabled_commands and command_name in disabled_commands.get("commands", [])
-
-# Custom check function to disable commands
-def check_if_disabled():
-    async def predicate(interaction: discord.Interaction) -> bool:
-        guild_id = interaction.guild.id
-        command_name = interaction.command.name
-        if await is_command_disabled(guild_id, command_name):
-            await interaction.response.send_message(f"The command `{command_name}` is disabled in this server.", ephemeral=True)
-            return False  # Prevents the slash command from executing
-        return True
-    return app_commands.check(predicate)
+from utils.disabled_commands import check_if_disabled
 
 class WarnCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    def save_warn_data(self, guild_id, member_id, warn_data):
+    async def save_warn_data(self, guild_id, member_id, warn_data):
         """Save warning data to MongoDB."""
-        warn_data_col.update_one(
+        await self.bot.db.warn_data.update_one(
             {"guild_id": guild_id, "member_id": member_id},
             {"$set": warn_data},
             upsert=True
         )
 
-    def load_warn_data(self, guild_id, member_id):
+    async def load_warn_data(self, guild_id, member_id):
         """Load warning data from MongoDB."""
-        return warn_data_col.find_one({"guild_id": guild_id, "member_id": member_id}) or {
+        return await self.bot.db.warn_data.find_one({"guild_id": guild_id, "member_id": member_id}) or {
             "warn_count": 0,
             "warnings": []
         }
@@ -79,7 +52,7 @@ class WarnCog(commands.Cog):
         member_id = str(member.id)
 
         # Load the existing warning data from MongoDB
-        warn_data = self.load_warn_data(guild_id, member_id)
+        warn_data = await self.load_warn_data(guild_id, member_id)
 
         # Increment the warning count for the member
         warn_data["warn_count"] += 1
@@ -92,7 +65,7 @@ class WarnCog(commands.Cog):
         })
 
         # Save the updated warning data to MongoDB
-        self.save_warn_data(guild_id, member_id, warn_data)
+        await self.save_warn_data(guild_id, member_id, warn_data)
 
         # Create an embed to show the warning
         warn_embed = discord.Embed(
@@ -154,7 +127,7 @@ class WarnCog(commands.Cog):
                     await interaction.followup.send(f"An error occurred while sending DM about kick: {str(e)}", ephemeral=True)
 
                 # Remove the user's warning data after being kicked
-                warn_data_col.delete_one({"guild_id": guild_id, "member_id": member_id})
+                await self.bot.db.warn_data.delete_one({"guild_id": guild_id, "member_id": member_id})
 
             except discord.Forbidden:
                 await interaction.followup.send(f"Could not kick {member.name}. ❌", ephemeral=True)
@@ -172,9 +145,9 @@ class WarnCog(commands.Cog):
         guild_id = str(interaction.guild.id)
         member_id = str(member.id)
 
-        if warn_data_col.find_one({"guild_id": guild_id, "member_id": member_id}):
+        if await self.bot.db.warn_data.find_one({"guild_id": guild_id, "member_id": member_id}):
             # Remove warnings for the member from MongoDB
-            warn_data_col.delete_one({"guild_id": guild_id, "member_id": member_id})
+            await self.bot.db.warn_data.delete_one({"guild_id": guild_id, "member_id": member_id})
             await interaction.response.send_message(f"All warnings for **{member.name}** have been removed. 🌟", ephemeral=True)
         else:
             await interaction.response.send_message(f"**{member.name}** has no warnings to remove. 🌟", ephemeral=True)
@@ -0,0 +1,57 @@
+import discord
+from discord.ext import commands
+from .Cache_utils import audio_cache
+
+class AudioCacheCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.group(invoke_without_command=True)
+    @commands.is_owner()
+    async def audiocache(self, ctx):
+        """Show the local audio cache. `audiocache pin <video id>` keeps a track, `audiocache unpin <video id>` lets it go."""
+        if not audio_cache.enabled:
+            await ctx.send("The audio cache is off, set AUDIO_CACHE_DIR to turn it on.")
+            return
+        stats = audio_cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "n/a"
+        lines = [
+            f"Files: {stats['files']} ({stats['pinned']} pinned, {stats['downloading']} downloading)",
+            f"Size: {stats['bytes'] / 1024 / 1024:.1f} / {stats['max_bytes'] / 1024 / 1024:.0f} MB, policy: {audio_cache.policy}",
+            f"Hits: {stats['hits']}, misses: {stats['misses']}, hit rate: {hit_rate}",
+        ]
+        top = sorted(audio_cache.entries.items(), key=lambda item: item[1]["hits"], reverse=True)[:5]
+        if top:
+            lines.append("")
+            lines.append("Most played:")
+            for video_id, entry in top:
+                pinned = " (pinned)" if entry["pinned"] else ""
+                lines.append(f"  {video_id}: {entry['hits']} plays, {entry['size'] / 1024 / 1024:.1f} MB{pinned}")
+        await ctx.send("```\n" + "\n".join(lines) + "\n```")
+
+    @audiocache.command()
+    @commands.is_owner()
+    async def pin(self, ctx, video_id: str):
+        if await audio_cache.set_pinned(video_id, True):
+            await ctx.send(f"Pinned {video_id}, it won't be evicted.")
+        else:
+            await ctx.send(f"{video_id} isn't in the audio cache.")
+
+    @audiocache.command()
+    @commands.is_owner()
+    async def unpin(self, ctx, video_id: str):
+        if await audio_cache.set_pinned(video_id, False):
+            await ctx.send(f"Unpinned {video_id}.")
+        else:
+            await ctx.send(f"{video_id} isn't in the audio cache.")
+
+    @audiocache.error
+    @pin.error
+    @unpin.error
+    async def audiocache_error(self, ctx, error):
+        if isinstance(error, commands.NotOwner):
+            await ctx.send("Only the bot owner can manage the audio cache.")
+
+async def setup(bot):
+    await bot.add_cog(AudioCacheCog(bot))
@@ -0,0 +1,223 @@
+# Cache_utils.py
+import asyncio
+import json
+import os
+import time
+from .Music_utils import FFMPEG_OPTIONS, OPUS_BITRATE
+from utils.ttl_cache import TTLCache
+
+# Optional local copy of frequently played tracks, so they don't have to be streamed from YouTube every time.
+# Off unless AUDIO_CACHE_DIR is set.
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR")
+AUDIO_CACHE_MAX_MB = int(os.getenv("AUDIO_CACHE_MAX_MB", "2048"))
+AUDIO_CACHE_POLICY = os.getenv("AUDIO_CACHE_POLICY", "lru").lower()  # "lru" or "lfu"
+AUDIO_CACHE_MIN_PLAYS = int(os.getenv("AUDIO_CACHE_MIN_PLAYS", "2"))  # Plays before a track is downloaded
+AUDIO_CACHE_MAX_DURATION = int(os.getenv("AUDIO_CACHE_MAX_DURATION", "1200"))  # Longer tracks aren't cached
+AUDIO_CACHE_FLUSH_SECONDS = 300  # How often access statistics are written to the index
+
+class AudioCache:
+    """Tracks stored as Ogg Opus files in a size-capped directory, with access statistics in `index.json`.
+
+    A track is downloaded in the background once it has been streamed AUDIO_CACHE_MIN_PLAYS times. Opus
+    streams are remuxed without re-encoding. When the directory grows past its cap, the least recently
+    used (or, with the "lfu" policy, least often played) files are deleted first. Pinned tracks are never
+    evicted.
+    """
+
+    def __init__(self, directory, max_bytes, policy="lru", min_plays=2):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.min_plays = min_plays
+        self.entries = {}  # video_id -> {"size", "hits", "last_access", "pinned"}
+        self.plays = TTLCache(maxsize=4096, ttl=7 * 24 * 3600)  # video_id -> plays, for tracks not cached yet
+        self.downloads = {}  # video_id -> running download task
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.flusher = None
+
+    @property
+    def enabled(self):
+        return self.directory is not None
+
+    @property
+    def size(self):
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def file_path(self, video_id):
+        return os.path.join(self.directory, f"{video_id}.opus")
+
+    def index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    async def load(self):
+        """Read the index and start writing access statistics back periodically. Called from Play.cog_load."""
+        if not self.enabled:
+            return
+        await asyncio.to_thread(self.read_index)
+        if self.flusher is None:
+            self.flusher = asyncio.create_task(self.flush_periodically())
+
+    def read_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            with open(self.index_path(), "r") as file:
+                entries = json.load(file)
+        except FileNotFoundError:
+            entries = {}
+        except (OSError, ValueError) as e:
+            print(f"Failed to read the audio cache index, starting empty: {e}")
+            entries = {}
+        # Forget entries whose file is gone, and remove downloads a restart interrupted
+        self.entries = {video_id: entry for video_id, entry in entries.items() if os.path.isfile(self.file_path(video_id))}
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".part"):
+                os.remove(os.path.join(self.directory, filename))
+
+    def write_index(self):
+        temporary = self.index_path() + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(self.entries, file)
+        os.replace(temporary, self.index_path())
+
+    async def save(self):
+        if self.enabled and self.dirty:
+            self.dirty = False
+            try:
+                await asyncio.to_thread(self.write_index)
+            except OSError as e:
+                print(f"Failed to write the audio cache index: {e}")
+
+    async def flush_periodically(self):
+        while True:
+            await asyncio.sleep(AUDIO_CACHE_FLUSH_SECONDS)
+            await self.save()
+
+    def close(self):
+        """Stop background work and write the index one last time. Called from Play.cog_unload."""
+        if self.flusher:
+            self.flusher.cancel()
+            self.flusher = None
+        for task in self.downloads.values():
+            task.cancel()
+        if self.enabled and self.dirty:
+            try:
+                self.write_index()
+                self.dirty = False
+            except OSError as e:
+                print(f"Failed to write the audio cache index: {e}")
+
+    def lookup(self, video_id):
+        """Path of the cached file for a track, or None. Counts as an access."""
+        if not self.enabled:
+            return None
+        entry = self.entries.get(video_id)
+        if entry is None or not os.path.isfile(self.file_path(video_id)):
+            self.misses += 1
+            return None
+        entry["hits"] += 1
+        entry["last_access"] = time.time()
+        self.hits += 1
+        self.dirty = True
+        return self.file_path(video_id)
+
+    def record_play(self, track, stream):
+        """A track is being streamed from YouTube. Downloads it in the background once it's played often enough."""
+        video_id = track['id']
+        if not self.enabled or video_id in self.entries or video_id in self.downloads:
+            return
+        if not track.get('duration') or track['duration'] > AUDIO_CACHE_MAX_DURATION:
+            return
+        plays = self.plays.get(video_id, 0) + 1
+        self.plays.set(video_id, plays)
+        if plays >= self.min_plays:
+            task = asyncio.create_task(self.download(video_id, *stream))
+            self.downloads[video_id] = task
+            task.add_done_callback(lambda done: self.downloads.pop(video_id, None))
+
+    async def download(self, video_id, stream_url, codec=None):
+        path = self.file_path(video_id)
+        partial = path + ".part"
+        args = ["ffmpeg", "-nostdin", "-loglevel", "error", "-y", *FFMPEG_OPTIONS['before_options'].split(), "-i", stream_url, "-vn"]
+        if codec == 'opus':
+            args += ["-c:a", "copy"]
+        else:
+            args += ["-c:a", "libopus", "-b:a", f"{OPUS_BITRATE}k"]
+        args += ["-f", "opus", partial]
+
+        try:
+            process = await asyncio.create_subprocess_exec(*args, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+        except OSError as e:
+            print(f"Failed to start FFmpeg for the audio cache: {e}")
+            return
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            self.remove_file(partial)
+            raise
+        if process.returncode != 0:
+            print(f"Failed to cache {video_id}: {stderr.decode(errors='replace').strip()[-300:]}")
+            self.remove_file(partial)
+            return
+
+        os.replace(partial, path)
+        self.entries[video_id] = {"size": os.path.getsize(path), "hits": 0, "last_access": time.time(), "pinned": False}
+        self.plays.pop(video_id)
+        self.evict()
+        self.dirty = True
+        await self.save()
+
+    def eviction_order(self):
+        """Unpinned tracks, the first one to go first."""
+        unpinned = [video_id for video_id, entry in self.entries.items() if not entry["pinned"]]
+        if self.policy == "lfu":
+            return sorted(unpinned, key=lambda video_id: (self.entries[video_id]["hits"], self.entries[video_id]["last_access"]))
+        return sorted(unpinned, key=lambda video_id: self.entries[video_id]["last_access"])
+
+    def evict(self):
+        total = self.size
+        if total <= self.max_bytes:
+            return
+        for video_id in self.eviction_order():
+            if total <= self.max_bytes:
+                break
+            # A guild playing the file keeps its open handle, so this is safe mid-song
+            self.remove_file(self.file_path(video_id))
+            total -= self.entries.pop(video_id)["size"]
+            self.dirty = True
+
+    def remove_file(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Failed to remove {path} from the audio cache: {e}")
+
+    async def set_pinned(self, video_id, pinned):
+        """Pin (never evict) or unpin a cached track. Returns False if it isn't cached."""
+        entry = self.entries.get(video_id)
+        if entry is None:
+            return False
+        entry["pinned"] = pinned
+        self.dirty = True
+        if not pinned:
+            self.evict()
+        await self.save()
+        return True
+
+    def stats(self):
+        return {
+            "files": len(self.entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "pinned": sum(1 for entry in self.entries.values() if entry["pinned"]),
+            "downloading": len(self.downloads),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+audio_cache = AudioCache(AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_MB * 1024 * 1024, AUDIO_CACHE_POLICY, AUDIO_CACHE_MIN_PLAYS)
@@ -0,0 +1,40 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+from .Music_utils import AUDIO_FILTERS, SPEED_FILTERS
+from utils.disabled_commands import check_if_disabled
+
+class Filter(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name='filter', description="Turn an audio effect on or off for this server.")
+    @app_commands.describe(effect="The effect to toggle, or Off to clear them all")
+    @app_commands.choices(effect=[app_commands.Choice(name=label, value=name) for name, (label, _, _) in AUDIO_FILTERS.items()]
+                          + [app_commands.Choice(name="Off", value="off")])
+    @check_if_disabled()
+    async def filter(self, interaction: discord.Interaction, effect: app_commands.Choice[str]):
+        play_cog = self.bot.get_cog('Play')
+        player = play_cog.player(interaction.guild.id)
+
+        if effect.value == "off":
+            filters = ()
+        elif effect.value in player.filters:
+            filters = tuple(name for name in player.filters if name != effect.value)
+        else:
+            # Nightcore and vaporwave both change the speed, turning one on turns the other off
+            others = SPEED_FILTERS if effect.value in SPEED_FILTERS else ()
+            filters = tuple(name for name in player.filters if name not in others) + (effect.value,)
+        player.set_filters(name for name in AUDIO_FILTERS if name in filters)
+
+        if player.filters:
+            await interaction.response.send_message(f"Effects: {', '.join(AUDIO_FILTERS[name][0] for name in player.filters)} 🎛️")
+        else:
+            await interaction.response.send_message("All effects off! 🎛️")
+
+        # Apply it to the song that's playing, from where it is now
+        if player.playback is not None and interaction.guild.voice_client is not None:
+            await play_cog.restart_at(interaction.guild, player.playback.position)
+
+async def setup(bot):
+    await bot.add_cog(Filter(bot))
@@ -1,4 +1,13 @@
 # Music_utils.py
+import asyncio
+import functools
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
 import discord
 import yt_dlp as youtube_dl
 import spotipy
@@ -6,20 +15,162 @@ from discord import app_commands
 from spotipy.oauth2 import SpotifyClientCredentials
 from dotenv import load_dotenv
 import os
+from pymongo.errors import PyMongoError
+from utils.metrics import metrics
+from utils.ttl_cache import TTLCache
+from .Worker_utils import extraction_workers, WorkerError, WORKER_TIMEOUT
+from .Player_utils import MAX_QUEUE_LENGTH
 
 # Load environment variables from .env file
 load_dotenv()
 
 FFMPEG_OPTIONS = {'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5', 'options': '-vn'}
 
-# Initialize Spotify client
+# Hand discord.py Opus packets from FFmpeg instead of PCM, so Python neither scales nor re-encodes every frame.
+# Opus streams (most YouTube audio) are copied as they are, anything else is transcoded once by FFmpeg.
+# Volume is then an FFmpeg filter, changing it restarts FFmpeg where the song is. Set to 0 for the old PCM path.
+OPUS_PASSTHROUGH = os.getenv("OPUS_PASSTHROUGH", "1") != "0"
+OPUS_BITRATE = int(os.getenv("OPUS_BITRATE", "128"))  # kbps, when transcoding
+
+# Audio effects for /filter: name -> (label, FFmpeg filter graph, playback speed).
+# Nightcore and vaporwave resample to a fixed rate first, so the pitch shift is the same for 44.1 and 48kHz streams.
+AUDIO_FILTERS = {
+    'bassboost': ("Bass Boost", "bass=g=8:f=110:w=0.6", 1.0),
+    'nightcore': ("Nightcore", "aresample=48000,asetrate=60000,aresample=48000", 1.25),
+    'vaporwave': ("Vaporwave", "aresample=48000,asetrate=38400,aresample=48000", 0.8),
+    '8d': ("8D", "apulsator=hz=0.08", 1.0),
+    'normalize': ("Normalize", "loudnorm=I=-16:TP=-1.5:LRA=11", 1.0),  # Last, so it evens out the other effects too
+}
+SPEED_FILTERS = ('nightcore', 'vaporwave')  # Only one of these at a time
+
+@functools.lru_cache(maxsize=None)
+def filter_graph(filters):
+    """(FFmpeg filter graph, playback speed) for a tuple of AUDIO_FILTERS names. Built once per combination.
+
+    The effects are always chained in AUDIO_FILTERS order, whatever order they were turned on in.
+    """
+    names = [name for name in AUDIO_FILTERS if name in filters]
+    speed = 1.0
+    for name in names:
+        speed *= AUDIO_FILTERS[name][2]
+    return ",".join(AUDIO_FILTERS[name][1] for name in names), speed
+
+def create_audio_source(stream_url, codec=None, volume=1.0, start=0, filters=()):
+    """The FFmpeg source for a stream URL or a local file, starting `start` seconds in.
+
+    `codec` is its audio codec as reported by yt-dlp, if known. `filters` are AUDIO_FILTERS names.
+    """
+    graph = filter_graph(tuple(filters))[0]
+    # The reconnect options only exist for network streams
+    before_options = FFMPEG_OPTIONS['before_options'] if "://" in stream_url else ""
+    if start:
+        # Input-side seek: FFmpeg skips straight there instead of decoding everything before it
+        before_options = f"-ss {start:.2f} {before_options}"
+    before_options = before_options.strip() or None
+    if not OPUS_PASSTHROUGH:
+        options = FFMPEG_OPTIONS['options'] + (f" -filter:a {graph}" if graph else "")
+        return discord.FFmpegPCMAudio(stream_url, before_options=before_options, options=options)
+    if codec == 'opus' and volume == 1.0 and not graph:
+        return discord.FFmpegOpusAudio(stream_url, codec='copy', before_options=before_options, options=FFMPEG_OPTIONS['options'])
+    chain = [graph] if graph else []
+    if volume != 1.0:
+        chain.append(f"volume={volume:.4f}")
+    options = FFMPEG_OPTIONS['options']
+    if chain:
+        options += f" -filter:a {','.join(chain)}"
+    return discord.FFmpegOpusAudio(stream_url, bitrate=OPUS_BITRATE, before_options=before_options, options=options)
+
+# Gapless playback: the next track's FFmpeg is started this many seconds before the current one ends,
+# and this many 20ms frames are read ahead so it can start playing straight away
+PREWARM_SECONDS = float(os.getenv("PREWARM_SECONDS", "5"))
+PREWARM_BUFFER_FRAMES = int(os.getenv("PREWARM_BUFFER_FRAMES", "50"))
+FRAME_SECONDS = 0.02  # discord.py reads audio in 20ms frames
+
+class PlaybackSource(discord.AudioSource):
+    """The source handed to the voice client: a count of frames played, for the position, plus volume control.
+
+    PCM sources get live volume through PCMVolumeTransformer. Opus sources are passed through untouched,
+    their volume is already part of the FFmpeg command.
+    """
+
+    def __init__(self, original, volume=1.0, start=0, speed=1.0):
+        self.original = original if original.is_opus() else discord.PCMVolumeTransformer(original, volume=volume)
+        self.start = start  # Where in the track FFmpeg started
+        self.speed = speed  # Track seconds per second played, nightcore and vaporwave change it
+        self.frames = 0
+
+    @property
+    def position(self):
+        """Seconds into the track (pauses don't count)."""
+        return self.start + self.frames * FRAME_SECONDS * self.speed
+
+    @property
+    def live_volume(self):
+        """Whether setting `volume` changes the song that's playing."""
+        return not self.original.is_opus()
+
+    @property
+    def volume(self):
+        return self.original.volume if self.live_volume else None
+
+    @volume.setter
+    def volume(self, value):
+        if self.live_volume:
+            self.original.volume = value
+
+    def read(self):
+        data = self.original.read()
+        if data:
+            self.frames += 1
+        return data
+
+    def is_opus(self):
+        return self.original.is_opus()
+
+    def cleanup(self):
+        self.original.cleanup()
+
+class PrewarmedAudio(discord.AudioSource):
+    """An FFmpeg source started ahead of time, with its first frames already read into memory."""
+
+    def __init__(self, stream_url, codec=None, volume=1.0, filters=(), buffer_frames=PREWARM_BUFFER_FRAMES):
+        # Spawns FFmpeg and waits for the first frames, so create it from a worker thread
+        self.volume = volume
+        self.filters = filters
+        self.source = create_audio_source(stream_url, codec, volume, filters=filters)
+        self.buffer = deque()
+        for _ in range(buffer_frames):
+            data = self.source.read()
+            if not data:
+                break
+            self.buffer.append(data)
+
+    def read(self):
+        if self.buffer:
+            return self.buffer.popleft()
+        return self.source.read()
+
+    def is_opus(self):
+        return self.source.is_opus()
+
+    def cleanup(self):
+        self.buffer.clear()
+        self.source.cleanup()
+
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
-SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_ID")
+SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 
-spotify = spotipy.Spotify(auth_manager=SpotifyClientCredentials(
-    client_id=SPOTIFY_CLIENT_ID,
-    client_secret=SPOTIFY_CLIENT_SECRET
-))
+spotify = None
+
+def get_spotify():
+    """Create the Spotify client the first time a Spotify link is played, not at import."""
+    global spotify
+    if spotify is None:
+        spotify = spotipy.Spotify(auth_manager=SpotifyClientCredentials(
+            client_id=SPOTIFY_CLIENT_ID,
+            client_secret=SPOTIFY_CLIENT_SECRET
+        ))
+    return spotify
 
 YTDL_OPTIONS = {
     'format': 'bestaudio/best',
@@ -27,30 +178,481 @@ YTDL_OPTIONS = {
     'quiet': True
 }
 
-def get_youtube_info(query):
-    with youtube_dl.YoutubeDL(YTDL_OPTIONS) as ydl:
+# Playlists and mixes: only the listing is fetched (no per-video page), stream URLs are resolved at play time.
+# Nothing past what fits in a queue is fetched.
+YTDL_PLAYLIST_OPTIONS = {
+    'extract_flat': 'in_playlist',
+    'noplaylist': False,
+    'playlistend': MAX_QUEUE_LENGTH,
+    'quiet': True
+}
+
+# yt-dlp extraction is blocking, so it runs in a small pool of worker threads
+YTDL_WORKERS = int(os.getenv("YTDL_WORKERS", "4"))
+YTDL_TIMEOUT = float(os.getenv("YTDL_TIMEOUT", "20"))  # Seconds before a search is given up on
+
+ytdl_pool = ThreadPoolExecutor(max_workers=YTDL_WORKERS, thread_name_prefix="yt-dlp")
+ytdl_workers = threading.local()
+in_flight = {}  # yt-dlp target -> (future, number of waiters), so the same extraction only runs once at a time
+
+# Search results are cached: query -> video ID -> metadata, in memory and in MongoDB.
+# Stream URLs expire after a few hours, so they are only kept in memory and refreshed on their own.
+QUERY_TTL = int(os.getenv("YT_QUERY_TTL", str(7 * 24 * 3600)))
+METADATA_TTL = int(os.getenv("YT_METADATA_TTL", str(30 * 24 * 3600)))
+STREAM_URL_TTL = 3600  # Used when the stream URL doesn't say when it expires
+STREAM_URL_MARGIN = 300  # Refresh stream URLs this many seconds before they expire
+PREFETCH_TRACKS = int(os.getenv("PREFETCH_TRACKS", "2"))  # Upcoming tracks whose stream URL is resolved ahead of time
+
+def get_ytdl(playlist=False):
+    """The worker thread's own YoutubeDL, created once and reused for every extraction it runs."""
+    name = "playlist_ydl" if playlist else "ydl"
+    ydl = getattr(ytdl_workers, name, None)
+    if ydl is None:
+        ydl = youtube_dl.YoutubeDL(YTDL_PLAYLIST_OPTIONS if playlist else YTDL_OPTIONS)
+        setattr(ytdl_workers, name, ydl)
+    return ydl
+
+def extract_youtube_info(target):
+    """Blocking extraction of a search (`ytsearch:...`) or video URL, only call this from the worker pool."""
+    with metrics.timer("yt-dlp"):
+        info = get_ytdl().extract_info(target, download=False)
+    if 'entries' in info:
+        video = info['entries'][0]
+    else:
+        video = info
+    return {
+        'id': video.get('id'),
+        'url': video['url'],
+        'title': video['title'],
+        'duration': video.get('duration'),
+        'thumbnail': video.get('thumbnail'),
+        'uploader': video.get('uploader'),
+        'acodec': video.get('acodec'),
+    }
+
+async def extract_on_worker(target, timeout):
+    """Extract on an extraction worker, or in-process if none is healthy or the worker drops the request.
+
+    The worker gets part of `timeout`, so a hung worker leaves the fallback time to finish within the caller's timeout.
+    """
+    worker = extraction_workers.pick(target)
+    if worker is not None:
         try:
-            info = ydl.extract_info(f"ytsearch:{query}", download=False)
-            if 'entries' in info:
-                video = info['entries'][0]
+            with metrics.timer("extraction-worker"):
+                return await worker.request("extract", min(WORKER_TIMEOUT, timeout / 2), target=target)
+        except WorkerError as e:
+            print(f"Extraction worker {worker.address} failed, extracting in-process: {e}")
+    return await asyncio.get_running_loop().run_in_executor(ytdl_pool, extract_youtube_info, target)
+
+def forget_extraction(target, future):
+    if in_flight.get(target, (None,))[0] is future:
+        del in_flight[target]
+
+async def extract(target, timeout=YTDL_TIMEOUT):
+    """Run an extraction in the yt-dlp thread pool, or on an extraction worker, without blocking the event loop. Returns None on failure.
+
+    Identical extractions running at the same time are shared. If every caller waiting on one times
+    out or is cancelled (e.g. the interaction expired) before a worker picked it up, it is dropped.
+    """
+    if target in in_flight:
+        future, waiters = in_flight[target]
+        in_flight[target] = (future, waiters + 1)
+    else:
+        if extraction_workers.enabled:
+            future = asyncio.ensure_future(extract_on_worker(target, timeout))
+        else:
+            future = asyncio.get_running_loop().run_in_executor(ytdl_pool, extract_youtube_info, target)
+        in_flight[target] = (future, 1)
+        future.add_done_callback(lambda done: forget_extraction(target, done))
+
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    except asyncio.TimeoutError:
+        print(f"Timed out fetching YouTube info for {target!r}")
+        return None
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"Error fetching YouTube info: {e}")
+        return None
+    finally:
+        entry = in_flight.get(target)
+        if entry and entry[0] is future and not future.done():
+            if entry[1] <= 1:
+                # Nobody is waiting anymore, don't run it if it hasn't started yet
+                future.cancel()
+                del in_flight[target]
             else:
-                video = info
-            return {'url': video['url'], 'title': video['title']}
-        except Exception as e:
-            print(f"Error fetching YouTube info: {e}")
-            return None
+                in_flight[target] = (future, entry[1] - 1)
+
+def is_youtube_playlist(query, whole_list=False):
+    """Whether a query should queue a whole YouTube playlist or mix.
 
-def get_spotify_tracks(link):
+    `/playlist?list=` links always do. A video link that also has a `list` parameter (e.g. a song shared
+    from a mix) is just that video, unless `whole_list` asks for the list it came from.
+    """
+    url = urlparse(query.strip())
+    if url.hostname is None or not url.hostname.removeprefix("www.").removeprefix("m.").removeprefix("music.") in ("youtube.com", "youtu.be"):
+        return False
+    if not parse_qs(url.query).get("list"):
+        return False
+    return url.path.rstrip("/") == "/playlist" or whole_list
+
+def extract_youtube_playlist(url):
+    """Blocking flat extraction of a playlist or mix: track references for its available videos, in order."""
+    with metrics.timer("yt-dlp"):
+        info = get_ytdl(playlist=True).extract_info(url, download=False)
     tracks = []
+    for entry in info.get('entries') or []:
+        # Private and deleted videos stay in playlists as placeholders without a duration
+        if not entry or not entry.get('id') or entry.get('title') in ("[Private video]", "[Deleted video]"):
+            continue
+        tracks.append(track_ref({
+            'id': entry['id'],
+            'title': entry.get('title') or "Unknown Title",
+            'duration': entry.get('duration'),
+            'thumbnail': f"https://i.ytimg.com/vi/{entry['id']}/hqdefault.jpg",
+            'uploader': entry.get('channel') or entry.get('uploader'),
+        }))
+    return tracks
+
+async def get_youtube_playlist(url, timeout=YTDL_TIMEOUT):
+    """Track references for a YouTube playlist or mix, without blocking the event loop. None on failure."""
+    future = asyncio.get_running_loop().run_in_executor(ytdl_pool, extract_youtube_playlist, url)
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        print(f"Timed out fetching the YouTube playlist {url!r}")
+        return None
+    except Exception as e:
+        print(f"Error fetching the YouTube playlist: {e}")
+        return None
+
+def parse_timestamp(text, current=0):
+    """Seconds from `1:30`, `1:02:05` or `90`. `+15` and `-15` are relative to `current`. None if it can't be read."""
+    text = text.strip()
+    sign = text[:1] if text[:1] in ("+", "-") else None
+    if sign:
+        text = text[1:].strip()
     try:
-        if "track" in link:
+        parts = [float(part) for part in text.split(":")]
+    except ValueError:
+        return None
+    if len(parts) > 3 or any(not math.isfinite(part) or part < 0 for part in parts):
+        return None
+    seconds = 0
+    for part in parts:
+        seconds = seconds * 60 + part
+    if sign == "+":
+        seconds = current + seconds
+    elif sign == "-":
+        seconds = current - seconds
+    return max(seconds, 0)
+
+def format_duration(seconds):
+    """3:32 or 1:02:05 from a duration in seconds."""
+    if not seconds:
+        return 'Unknown Duration'
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes}:{seconds:02}"
+
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+def stream_url_ttl(url):
+    """Seconds a googlevideo stream URL stays usable, from its `expire` parameter."""
+    expire = parse_qs(urlparse(url).query).get("expire")
+    if not expire or not expire[0].isdigit():
+        return STREAM_URL_TTL
+    return max(int(expire[0]) - time.time() - STREAM_URL_MARGIN, 0)
+
+class YoutubeCache:
+    """Two-level cache for YouTube lookups: in-memory LRUs in front of two MongoDB collections.
+
+    `youtube_queries` maps a normalized search to a video ID and `youtube_videos` maps a video ID to
+    its metadata (title, duration, thumbnail, uploader). Both expire through TTL indexes. Without a
+    database (set_database never called) only the in-memory level is used.
+    """
+
+    def __init__(self):
+        self.db = None
+        self.queries = TTLCache(maxsize=2048, ttl=QUERY_TTL)
+        self.videos = TTLCache(maxsize=2048, ttl=METADATA_TTL)
+        self.stream_urls = TTLCache(maxsize=1024)
+
+    async def set_database(self, db):
+        """Use MongoDB as the second level. Called from Play.cog_load."""
+        self.db = db
+        try:
+            await db.youtube_queries.create_index("expires_at", expireAfterSeconds=0)
+            await db.youtube_videos.create_index("expires_at", expireAfterSeconds=0)
+        except PyMongoError as e:
+            print(f"Failed to create YouTube cache indexes: {e}")
+
+    async def get_video_id(self, query):
+        video_id = self.queries.get(query)
+        if video_id is None and self.db is not None:
+            try:
+                doc = await self.db.youtube_queries.find_one({"_id": query, "expires_at": {"$gt": datetime.now(timezone.utc)}})
+            except PyMongoError as e:
+                print(f"Failed to read the YouTube cache: {e}")
+                return None
+            if doc:
+                video_id = doc["video_id"]
+                self.queries.set(query, video_id)
+        return video_id
+
+    async def get_video(self, video_id):
+        video = self.videos.get(video_id)
+        if video is None and self.db is not None:
+            try:
+                doc = await self.db.youtube_videos.find_one({"_id": video_id, "expires_at": {"$gt": datetime.now(timezone.utc)}})
+            except PyMongoError as e:
+                print(f"Failed to read the YouTube cache: {e}")
+                return None
+            if doc:
+                video = {key: doc.get(key) for key in ('id', 'title', 'duration', 'thumbnail', 'uploader')}
+                self.videos.set(video_id, video)
+        return video
+
+    async def get_videos(self, video_ids):
+        """Metadata for many videos at once ({video_id: metadata}), with one database query for the ones not in memory."""
+        videos, missing = {}, []
+        for video_id in video_ids:
+            video = self.videos.get(video_id)
+            if video is None:
+                missing.append(video_id)
+            else:
+                videos[video_id] = video
+        if missing and self.db is not None:
+            try:
+                docs = await self.db.youtube_videos.find(
+                    {"_id": {"$in": missing}, "expires_at": {"$gt": datetime.now(timezone.utc)}}
+                ).to_list(None)
+            except PyMongoError as e:
+                print(f"Failed to read the YouTube cache: {e}")
+                return videos
+            for doc in docs:
+                video = {key: doc.get(key) for key in ('id', 'title', 'duration', 'thumbnail', 'uploader')}
+                self.videos.set(doc["_id"], video)
+                videos[doc["_id"]] = video
+        return videos
+
+    def get_stream(self, video_id):
+        return self.stream_urls.get(video_id)
+
+    def set_stream(self, video_id, url, codec=None):
+        ttl = stream_url_ttl(url)
+        if ttl > 0:
+            self.stream_urls.set(video_id, (url, codec), ttl=ttl)
+
+    async def store(self, query, video):
+        """Remember a search result: the query, the video's metadata and (in memory) its stream URL."""
+        video_id = video.get('id')
+        if not video_id:
+            return
+        metadata = {key: video.get(key) for key in ('id', 'title', 'duration', 'thumbnail', 'uploader')}
+        self.queries.set(query, video_id)
+        self.videos.set(video_id, metadata)
+        self.set_stream(video_id, video['url'], video.get('acodec'))
+
+        if self.db is not None:
+            now = datetime.now(timezone.utc)
+            try:
+                await self.db.youtube_queries.update_one(
+                    {"_id": query},
+                    {"$set": {"video_id": video_id, "expires_at": now + timedelta(seconds=QUERY_TTL)}},
+                    upsert=True
+                )
+                await self.db.youtube_videos.update_one(
+                    {"_id": video_id},
+                    {"$set": {**metadata, "expires_at": now + timedelta(seconds=METADATA_TTL)}},
+                    upsert=True
+                )
+            except PyMongoError as e:
+                print(f"Failed to write the YouTube cache: {e}")
+
+youtube_cache = YoutubeCache()
+
+def track_ref(video):
+    """What the queue stores for a song: stable metadata only, the stream URL is resolved right before playing."""
+    return {
+        'id': video['id'],
+        'title': video['title'],
+        'duration': video.get('duration'),
+        'thumbnail': video.get('thumbnail'),
+        'uploader': video.get('uploader'),
+        'webpage_url': f"https://www.youtube.com/watch?v={video['id']}",
+    }
+
+async def get_youtube_info(query, timeout=YTDL_TIMEOUT):
+    """Search YouTube without blocking the event loop.
+
+    Returns a track reference ({'id', 'title', 'duration', 'thumbnail', 'uploader', 'webpage_url'})
+    or None. Known searches are answered from the cache without running yt-dlp at all.
+    """
+    key = normalize_query(query)
+    video_id = await youtube_cache.get_video_id(key)
+    if video_id:
+        video = await youtube_cache.get_video(video_id)
+        if video:
+            return track_ref({**video, 'id': video_id})
+
+    video = await extract(f"ytsearch:{key}", timeout)
+    if video is None or not video.get('id'):
+        return None
+    # Also keeps the fresh stream URL, so playing it soon won't need another extraction
+    await youtube_cache.store(key, video)
+    return track_ref(video)
+
+async def get_stream(track, timeout=YTDL_TIMEOUT):
+    """(stream URL, audio codec) of a track reference, from the cache or extracted by video ID. None on failure."""
+    stream = youtube_cache.get_stream(track['id'])
+    if stream is None:
+        video = await extract(track['webpage_url'], timeout)
+        if video is None:
+            return None
+        stream = (video['url'], video.get('acodec'))
+        youtube_cache.set_stream(track['id'], *stream)
+    return stream
+
+async def prefetch_stream_urls(tracks):
+    """Resolve stream URLs of upcoming tracks in the background, so they start without waiting on yt-dlp."""
+    await asyncio.gather(*(get_stream(track) for track in tracks))
+
+# Tracks of a Spotify playlist/album searched on YouTube at the same time
+SPOTIFY_IMPORT_WORKERS = int(os.getenv("SPOTIFY_IMPORT_WORKERS", "4"))
+# Saved Spotify -> YouTube matches below this confidence are searched again
+MAPPING_MIN_CONFIDENCE = float(os.getenv("MAPPING_MIN_CONFIDENCE", "0.5"))
+
+def match_confidence(spotify_duration, youtube_duration):
+    """How well a YouTube result's length fits the Spotify track, from 0 to 1. 0.5 when a duration is unknown."""
+    if not spotify_duration or not youtube_duration:
+        return 0.5
+    off_by = max(abs(spotify_duration - youtube_duration) - 2, 0)  # A couple of seconds of silence is normal
+    return round(max(0.0, 1 - off_by / max(0.2 * spotify_duration, 30)), 3)
+
+class SpotifyMappings:
+    """Which YouTube video each Spotify track resolved to, kept for good in the `spotify_tracks` collection.
+
+    Filled the first time a track is searched and read back a whole page at a time when a playlist is
+    imported, so importing a playlist again doesn't search YouTube at all. Each match keeps both durations
+    and a confidence from how well they agree.
+    """
+
+    def __init__(self):
+        self.db = None
+        self.mappings = TTLCache(maxsize=8192)  # Spotify track ID -> (video ID, confidence)
+
+    def set_database(self, db):
+        self.db = db
+
+    async def get_many(self, spotify_ids):
+        """{Spotify track ID: video ID} for the ones with a confident enough match."""
+        found, missing = {}, []
+        for spotify_id in spotify_ids:
+            mapping = self.mappings.get(spotify_id)
+            if mapping is None:
+                missing.append(spotify_id)
+            elif mapping[1] >= MAPPING_MIN_CONFIDENCE:
+                found[spotify_id] = mapping[0]
+        if missing and self.db is not None:
+            try:
+                docs = await self.db.spotify_tracks.find({"_id": {"$in": missing}}).to_list(None)
+            except PyMongoError as e:
+                print(f"Failed to read the Spotify mappings: {e}")
+                return found
+            for doc in docs:
+                self.mappings.set(doc["_id"], (doc["video_id"], doc.get("confidence", 0)))
+                if doc.get("confidence", 0) >= MAPPING_MIN_CONFIDENCE:
+                    found[doc["_id"]] = doc["video_id"]
+        return found
+
+    async def store(self, track, video):
+        confidence = match_confidence(track.get('duration'), video.get('duration'))
+        self.mappings.set(track['spotify_id'], (video['id'], confidence))
+        if self.db is None:
+            return
+        try:
+            await self.db.spotify_tracks.update_one(
+                {"_id": track['spotify_id']},
+                {"$set": {
+                    "video_id": video['id'],
+                    "query": track['query'],
+                    "confidence": confidence,
+                    "spotify_duration": track.get('duration'),
+                    "youtube_duration": video.get('duration'),
+                    "updated_at": datetime.now(timezone.utc),
+                }},
+                upsert=True
+            )
+        except PyMongoError as e:
+            print(f"Failed to save the Spotify mapping: {e}")
+
+spotify_mappings = SpotifyMappings()
+
+def spotify_track(track):
+    """What an import needs from a Spotify track: its ID, the YouTube search and its duration in seconds."""
+    return {
+        'spotify_id': track.get('id'),
+        'query': track['name'] + " " + track['artists'][0]['name'],
+        'duration': (track.get('duration_ms') or 0) / 1000 or None,
+    }
+
+async def resolve_spotify_tracks(tracks):
+    """Look up saved matches for a page of Spotify tracks: {position in `tracks`: track reference}.
+
+    Two database queries at most for the whole page, no YouTube searches. The rest need `search_spotify_track`.
+    """
+    mappings = await spotify_mappings.get_many([track['spotify_id'] for track in tracks if track['spotify_id']])
+    videos = await youtube_cache.get_videos(set(mappings.values()))
+    resolved = {}
+    for index, track in enumerate(tracks):
+        video = videos.get(mappings.get(track['spotify_id']))
+        if video:
+            resolved[index] = track_ref({**video, 'id': mappings[track['spotify_id']]})
+    return resolved
+
+async def search_spotify_track(track):
+    """Search YouTube for a Spotify track and remember the match. Returns a track reference or None."""
+    video = await get_youtube_info(track['query'])
+    if video and track['spotify_id']:
+        await spotify_mappings.store(track, video)
+    return video
+
+def fetch_spotify_page(link, page=None):
+    """Blocking: the first page of a Spotify track, playlist or album link, or the page after `page`.
+
+    Returns (spotify_track() dicts, total tracks, current page if there is a next one else None).
+    """
+    spotify = get_spotify()
+    with metrics.timer("spotify"):
+        if page is not None:
+            results = spotify.next(page)
+        elif "track" in link:
             result = spotify.track(link)
-            tracks.append(result['name'] + " " + result['artists'][0]['name'])
+            return [spotify_track(result)], 1, None
         elif "playlist" in link:
-            results = spotify.playlist_items(link)
-            for item in results['items']:
-                track = item['track']
-                tracks.append(track['name'] + " " + track['artists'][0]['name'])
-    except Exception as e:
-        print(f"Error fetching Spotify tracks: {e}")
-    return tracks
+            results = spotify.playlist_items(link, additional_types=("track",))
+        elif "album" in link:
+            results = spotify.album_tracks(link)
+        else:
+            return [], 0, None
+
+    tracks = []
+    for item in results['items']:
+        # Playlist items wrap the track, album items are the track; removed tracks are None
+        track = item.get('track') if 'track' in item else item
+        if track and track.get('name') and track.get('artists'):
+            tracks.append(spotify_track(track))
+    return tracks, results.get('total', len(tracks)), results if results.get('next') else None
+
+async def iter_spotify_tracks(link):
+    """Yield (spotify_track() dicts, total tracks) for every page of a Spotify link, without blocking the event loop."""
+    page = None
+    while True:
+        tracks, total, page = await asyncio.to_thread(fetch_spotify_page, link, page)
+        yield tracks, total
+        if page is None:
+            break
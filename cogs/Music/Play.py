@@ -1,56 +1,128 @@
 import discord
-from discord.ext import commands
-import yt_dlp as youtube_dl
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-import os
-import random
-import json
+from discord.ext import commands, tasks
 import asyncio
-from .Music_utils import get_youtube_info, get_spotify_tracks, FFMPEG_OPTIONS
+import itertools
+from types import SimpleNamespace
+from pymongo.errors import PyMongoError
+from .Music_utils import (
+    get_youtube_info, get_stream, prefetch_stream_urls, iter_spotify_tracks, youtube_cache, format_duration,
+    spotify_mappings, resolve_spotify_tracks, search_spotify_track, is_youtube_playlist, get_youtube_playlist,
+    create_audio_source, filter_graph, AUDIO_FILTERS, PlaybackSource, PrewarmedAudio, SPOTIFY_IMPORT_WORKERS, PREFETCH_TRACKS, PREWARM_SECONDS
+)
+from .Player_utils import GuildPlayer, PLAYING, STOPPED, MAX_QUEUE_LENGTH
+from .Cache_utils import audio_cache
+from .Worker_utils import extraction_workers
+from .Session_utils import SessionStore, SESSION_FLUSH_SECONDS, MUSIC_RESUME, RESUME_CONCURRENCY
 from discord import app_commands
-from pymongo import MongoClient
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-MONGODB_URI = os.getenv("MONGODB_URI")
-
-client = MongoClient(MONGODB_URI)
-db = client["Slavie"]  # Database name
-disabled_commands_col = db.disabled_commands
-
-def load_disabled_commands():
-    """Load the disabled commands from MongoDB."""
-    return disabled_commands_col.find_one({"guild_id": str(os.getenv("GUILD_ID"))}) or {}
-
-async def is_command_disabled(guild_id, command_name):
-    """Check if a command is disabled for a specific guild."""
-    disabled_commands = disabled_commands_col.find_one({"guild_id": str(guild_id)})
-    return disabled_commands and command_name in disabled_commands.get("commands", [])
-
-# Custom check function to disable commands
-def check_if_disabled():
-    async def predicate(interaction: discord.Interaction) -> bool:
-        guild_id = interaction.guild.id
-        command_name = interaction.command.name
-        if await is_command_disabled(guild_id, command_name):
-            await interaction.response.send_message(f"The command `{command_name}` is disabled in this server.", ephemeral=True)
-            return False  # Prevents the slash command from executing
-        return True
-    return app_commands.check(predicate)
+from utils.disabled_commands import check_if_disabled
+
+class PlayerControls(discord.ui.View):
+    """The now-playing buttons. One persistent view serves every guild: it's registered with bot.add_view,
+    so the buttons keep working after a restart, and each press goes to the pressing guild's player."""
+
+    def __init__(self, play_cog):
+        super().__init__(timeout=None)
+        self.play_cog = play_cog
+
+    @discord.ui.button(label='Pause', style=discord.ButtonStyle.primary, custom_id='pause')
+    async def pause(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.play_cog.pause_song(interaction)
+
+    @discord.ui.button(label='Resume', style=discord.ButtonStyle.success, custom_id='resume')
+    async def resume(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.play_cog.resume_song(interaction)
+
+    @discord.ui.button(label='Stop', style=discord.ButtonStyle.danger, custom_id='stop')
+    async def stop_music(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.play_cog.stop_song(interaction)
+
+    @discord.ui.button(label='Skip', style=discord.ButtonStyle.secondary, custom_id='skip')
+    async def skip(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.play_cog.skip_song(interaction)
+
+    @discord.ui.button(label='Shuffle', style=discord.ButtonStyle.secondary, custom_id='shuffle')
+    async def shuffle(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.play_cog.shuffle_song(interaction)
+
+    @discord.ui.button(label='Loop', style=discord.ButtonStyle.secondary, custom_id='loop')
+    async def loop(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.play_cog.loop_song(interaction)
+
+    @discord.ui.button(label='Loop All', style=discord.ButtonStyle.secondary, custom_id='loop_all')
+    async def loop_all(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.play_cog.loop_all_songs(interaction)
+
+class ResumeOffer(discord.ui.View):
+    """'Continue' button offered after a restart when MUSIC_RESUME=offer."""
+
+    def __init__(self, play_cog, doc):
+        super().__init__(timeout=600)
+        self.play_cog = play_cog
+        self.doc = doc
+        self.message = None
+
+    @discord.ui.button(label='Continue', style=discord.ButtonStyle.success)
+    async def resume(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.stop()
+        await interaction.response.edit_message(content="Picking up where I left off! 🎶", view=None)
+        await self.play_cog.resume_session(self.doc, interaction.user)
+
+    async def on_timeout(self):
+        # Not wanted, forget the saved session
+        self.play_cog.sessions.mark(self.doc["_id"])
+        if self.message is not None:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
 
 class Play(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.queue = {}
-        self.is_playing = {}
-        self.current_song = {}
-        self.loop = {}
-        self.loop_all = {}
-        self.shuffle_active = {}
-        self.is_paused = {}
-        self.volume = {}  # Centralized volume per guild
+        self.players = {}  # guild_id -> GuildPlayer, used by all the music commands
+        self.queue_limits = {}  # guild_id -> queue cap set with /queuelimit
+        self.prefetches = set()  # Background stream URL lookups for upcoming tracks
+        self.controls = PlayerControls(self)  # Shared by every guild's now-playing message
+        self.sessions = SessionStore(self.session_snapshot)  # Saved queues, resumed after a restart
+        self.resumed = False
+
+    def player(self, guild_id):
+        """The guild's GuildPlayer, created on first use."""
+        player = self.players.get(guild_id)
+        if player is None:
+            player = self.players[guild_id] = GuildPlayer(guild_id)
+            player.on_change = lambda changed: self.sessions.mark(changed.guild_id)
+            player.max_queue = self.queue_limits.get(guild_id, MAX_QUEUE_LENGTH)
+        return player
+
+    async def load_queue_limits(self):
+        """Every guild's /queuelimit, kept in memory like the disabled commands."""
+        try:
+            self.queue_limits = {doc["_id"]: doc["max_queue"] async for doc in self.bot.db.music_settings.find({})}
+        except PyMongoError as e:
+            print(f"Failed to load the queue limits: {e}")
+
+    async def set_queue_limit(self, guild_id, limit):
+        """Set a guild's queue cap, at most MAX_QUEUE_LENGTH. Tracks already queued past it stay queued."""
+        limit = min(limit, MAX_QUEUE_LENGTH)
+        await self.bot.db.music_settings.update_one({"_id": guild_id}, {"$set": {"max_queue": limit}}, upsert=True)
+        self.queue_limits[guild_id] = limit
+        self.player(guild_id).max_queue = limit
+        return limit
+
+    async def cog_load(self):
+        # Keep YouTube search results in MongoDB too, so they survive restarts
+        await youtube_cache.set_database(self.bot.db)
+        spotify_mappings.set_database(self.bot.db)
+        await audio_cache.load()
+        await self.load_queue_limits()
+        extraction_workers.start()
+        # Same custom_ids as before, so buttons on now-playing messages from before a restart work too
+        self.bot.add_view(self.controls)
+        self.sessions.set_database(self.bot.db)
+        self.save_sessions.start()
+        if self.bot.is_ready():
+            asyncio.create_task(self.resume_sessions())
 
     async def join_channel(self, interaction: discord.Interaction):
         if interaction.user.voice is None:
@@ -61,11 +133,17 @@ class Play(commands.Cog):
             await voice_channel.connect()
         elif interaction.guild.voice_client.channel != voice_channel:
             await interaction.guild.voice_client.move_to(voice_channel)
+        await self.resume_interrupted(interaction)
         return interaction.guild.voice_client
 
     @app_commands.command(name='play', description="Play a song from YouTube or Spotify.")
+    @app_commands.describe(
+        query="A song to search for, or a YouTube/Spotify link (playlists and albums work too)",
+        skip_duplicates="Don't add songs that are already queued or playing",
+        whole_playlist="For a video link from a playlist or mix, queue the whole list instead of just the video"
+    )
     @check_if_disabled()
-    async def play(self, interaction: discord.Interaction, *, query: str):
+    async def play(self, interaction: discord.Interaction, *, query: str, skip_duplicates: bool = False, whole_playlist: bool = False):
         # Defer the response to prevent timeout
         await interaction.response.defer(thinking=True)
 
@@ -73,50 +151,301 @@ class Play(commands.Cog):
         if voice_client is None:
             return
 
-        if interaction.guild.id not in self.queue:
-            self.queue[interaction.guild.id] = []
+        player = self.player(interaction.guild.id)
 
         if "spotify.com" in query:
-            tracks = get_spotify_tracks(query)
+            # Imported in the background, playback starts with the first track found
+            self.cancel_import(player)
+            task = player.import_task = asyncio.create_task(self.import_spotify(interaction, query, skip_duplicates))
+            task.add_done_callback(lambda done: setattr(player, "import_task", None) if player.import_task is done else None)
+            return
+        elif is_youtube_playlist(query, whole_playlist):
+            tracks = await get_youtube_playlist(query)
             if not tracks:
-                await interaction.followup.send("Could not find any songs from the Spotify link! 😢")
+                await interaction.followup.send("Could not load the playlist! 😢")
+                return
+            added, skipped = player.add_many(tracks, skip_duplicates)
+            if not added:
+                await interaction.followup.send("None of the playlist's songs could be added, the queue is full or they're all queued already! 😅")
                 return
-            for track in tracks:
-                video = get_youtube_info(track)
-                if video:
-                    self.queue[interaction.guild.id].append(video)
-            await interaction.followup.send(f"Added {len(tracks)} songs to the queue! 🎉")
+            message = f"Added {added} songs from the playlist to the queue! 🎉"
+            if skipped:
+                message += f" ({skipped} skipped: already queued or the queue is full)"
+            await interaction.followup.send(message)
+            self.prefetch_next(player)
         else:
-            video = get_youtube_info(query)
+            if player.is_full:
+                await interaction.followup.send("The queue is full! Skip some songs or wait for them to play. 😅")
+                return
+            video = await get_youtube_info(query)
             if video:
-                self.queue[interaction.guild.id].append(video)
+                if not player.add(video, skip_duplicates):
+                    await interaction.followup.send(f"{video['title']} is already in the queue! 💖")
+                    return
                 await interaction.followup.send(f"Added {video['title']} to the queue! 💖")
+                self.prefetch_next(player)
             else:
                 await interaction.followup.send("Could not find the song! 😢")
                 return
 
-        if not interaction.guild.voice_client.is_playing() and not self.is_playing.get(interaction.guild.id, False):
-            self.is_playing[interaction.guild.id] = True
+        if not interaction.guild.voice_client.is_playing() and not player.is_active:
+            player.transition(PLAYING)
             await self.play_next(interaction)
 
-    async def play_next(self, interaction: discord.Interaction):
-        if interaction.guild.id in self.queue and len(self.queue[interaction.guild.id]) > 0:
-            if self.shuffle_active.get(interaction.guild.id, False):
-                random.shuffle(self.queue[interaction.guild.id])
+    async def import_spotify(self, interaction: discord.Interaction, link: str, dedupe=False):
+        """Queue every track of a Spotify track, playlist or album link.
+
+        Pages are fetched one after another. Tracks matched on an earlier import come from the saved
+        Spotify mappings, the rest are searched on YouTube, SPOTIFY_IMPORT_WORKERS at a time. Tracks join the queue in playlist order as soon as they (and the ones before them) are found,
+        playback starts with the first one, and one progress message is edited along the way.
+        """
+        player = self.player(interaction.guild.id)
+        progress = await interaction.followup.send("Importing from Spotify... 🎶", wait=True)
+        work = asyncio.Queue(maxsize=SPOTIFY_IMPORT_WORKERS * 2)
+        found = {}          # Playlist position -> video, or None if it couldn't be found
+        next_position = 0   # Next playlist position to add to the queue
+        added = missing = skipped = total = 0
+        last_edit = 0.0
+
+        async def update_progress(done=False):
+            nonlocal last_edit
+            now = asyncio.get_running_loop().time()
+            if not done and now - last_edit < 2:
+                return
+            last_edit = now
+            if done and not added:
+                content = "Could not find any songs from the Spotify link! 😢"
+            elif done:
+                content = f"Added {added} songs to the queue! 🎉"
+                if missing:
+                    content += f" ({missing} couldn't be found)"
+                if skipped:
+                    content += f" ({skipped} skipped: already queued or the queue is full)"
+            else:
+                content = f"Importing from Spotify... {added + missing + skipped}/{total} 🎶"
+            try:
+                await progress.edit(content=content)
+            except discord.HTTPException as e:
+                print(f"Failed to update the Spotify import progress: {e}")
+
+        async def add_found():
+            nonlocal next_position, added, missing, skipped
+            if interaction.guild.voice_client is None:
+                raise discord.ClientException("Disconnected from the voice channel while importing")
+            while next_position in found:
+                video = found.pop(next_position)
+                next_position += 1
+                if video and player.add(video, dedupe):
+                    added += 1
+                elif video:
+                    skipped += 1
+                else:
+                    missing += 1
+            if added and not interaction.guild.voice_client.is_playing() and not player.is_active:
+                player.transition(PLAYING)
+                await self.play_next(interaction)
+            await update_progress()
+
+        async def read_playlist():
+            nonlocal total
+            position = 0
+            try:
+                async for tracks, total in iter_spotify_tracks(link):
+                    # Tracks matched on an earlier import are queued straight away, only new ones are searched
+                    resolved = await resolve_spotify_tracks(tracks)
+                    for index, track in enumerate(tracks):
+                        if index in resolved:
+                            found[position] = resolved[index]
+                        else:
+                            await work.put((position, track))
+                        position += 1
+                    if resolved:
+                        await add_found()
+                    if player.is_full:
+                        break  # No room for the rest, don't search for them
+            finally:
+                for _ in range(SPOTIFY_IMPORT_WORKERS):
+                    await work.put(None)
+
+        async def search_tracks():
+            while (job := await work.get()) is not None:
+                position, track = job
+                found[position] = await search_spotify_track(track)
+                await add_found()
+
+        tasks = [asyncio.create_task(read_playlist())]
+        tasks += [asyncio.create_task(search_tracks()) for _ in range(SPOTIFY_IMPORT_WORKERS)]
+        try:
+            await asyncio.gather(*tasks)
+        except discord.ClientException:
+            return
+        except Exception as e:
+            print(f"Error fetching Spotify tracks: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+        await update_progress(done=True)
+
+    def cancel_import(self, player):
+        """Stop the guild's running Spotify import, if any. Its search workers are cancelled with it."""
+        task, player.import_task = player.import_task, None
+        if task:
+            task.cancel()
+
+    def cog_unload(self):
+        for player in self.players.values():
+            # Imports would otherwise keep filling players of this unloaded instance
+            self.cancel_import(player)
+            self.discard_prewarmed(player)
+        for task in list(self.prefetches):
+            task.cancel()
+        audio_cache.close()
+        extraction_workers.close()
+        self.controls.stop()
+        self.save_sessions.cancel()
+
+    def session_snapshot(self, guild_id):
+        """What gets saved for a guild's session, or None when there's nothing to resume."""
+        player = self.players.get(guild_id)
+        guild = self.bot.get_guild(guild_id)
+        if player is None or guild is None or guild.voice_client is None or player.state == STOPPED:
+            return None
+        if player.current is None and not player.queue:
+            return None
+        return {
+            **player.snapshot(),
+            "voice_channel_id": guild.voice_client.channel.id,
+            "text_channel_id": player.text_channel_id,
+            "position": player.playback.position if player.playback and player.current else 0,
+        }
+
+    async def save_all_sessions(self):
+        """Write every changed session now, with fresh positions. Also used before a restart."""
+        for player in self.players.values():
+            if player.state == PLAYING:
+                self.sessions.mark(player.guild_id, full=False)
+        await self.sessions.flush()
+
+    @tasks.loop(seconds=SESSION_FLUSH_SECONDS)
+    async def save_sessions(self):
+        await self.save_all_sessions()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if not self.resumed:
+            await self.resume_sessions()
+
+    async def resume_sessions(self):
+        """Pick up the sessions saved before a restart, connecting RESUME_CONCURRENCY voice channels at a time."""
+        if self.resumed:
+            return
+        self.resumed = True
+        docs = await self.sessions.load()
+        if MUSIC_RESUME == "off":
+            for doc in docs:
+                self.sessions.mark(doc["_id"])  # Nothing to resume, delete them
+            return
+        limit = asyncio.Semaphore(RESUME_CONCURRENCY)
+
+        async def resume(doc):
+            async with limit:
+                try:
+                    if MUSIC_RESUME == "offer":
+                        await self.offer_resume(doc)
+                    else:
+                        await self.resume_session(doc)
+                except (discord.DiscordException, asyncio.TimeoutError) as e:
+                    print(f"Failed to resume the music in guild {doc['_id']}: {e}")
+                    self.sessions.mark(doc["_id"])
+
+        await asyncio.gather(*(resume(doc) for doc in docs))
+
+    def session_channels(self, doc):
+        guild = self.bot.get_guild(doc["_id"])
+        if guild is None:
+            return None, None, None
+        return guild, guild.get_channel(doc["voice_channel_id"]), guild.get_channel(doc.get("text_channel_id"))
+
+    async def resume_session(self, doc, user=None):
+        """Reconnect to the saved voice channel and continue the saved queue where it left off."""
+        guild, voice_channel, text_channel = self.session_channels(doc)
+        if voice_channel is None or text_channel is None:
+            self.sessions.mark(doc["_id"])  # The guild or its channels are gone, forget the session
+            return
+        player = self.player(guild.id)
+        if player.is_active:
+            return  # Someone started playing something in the meantime
+        player.restore(doc)
+        if guild.voice_client is None:
+            await voice_channel.connect()
+        player.transition(PLAYING)
+        # play_next only needs these from an interaction
+        context = SimpleNamespace(guild=guild, channel=text_channel, user=user or guild.me)
+        await self.play_next(context, start=doc.get("position", 0))
+
+    async def offer_resume(self, doc):
+        """Ask in the saved text channel whether to resume, instead of reconnecting on our own."""
+        guild, voice_channel, text_channel = self.session_channels(doc)
+        if voice_channel is None or text_channel is None:
+            self.sessions.mark(doc["_id"])
+            return
+        title = (doc.get("current") or (doc.get("queue") or [{}])[0]).get("title", "the queue")
+        view = ResumeOffer(self, doc)
+        view.message = await text_channel.send(f"I was playing **{title}** in {voice_channel.mention} before a restart. Continue? 🎶", view=view)
+
+    async def find_stream(self, track):
+        """(stream URL or cached file, codec) to play a track from, or None. Prefers the local audio cache."""
+        path = audio_cache.lookup(track['id'])
+        if path:
+            return path, 'opus'
+        stream = await get_stream(track)
+        if stream:
+            audio_cache.record_play(track, stream)
+        return stream
+
+    async def play_next(self, interaction: discord.Interaction, start=0):
+        """Play the next track in the queue, `start` seconds into it."""
+        if self.is_busy(interaction.guild.voice_client):
+            # A late after callback: /play started a new track between /stop and the old track's callback
+            return
+        player = self.player(interaction.guild.id)
+        prewarmed, player.prewarmed = player.prewarmed, None
+        self.discard_prewarmed(player)
+        if player.state == STOPPED:
+            # The track ended because of /stop
+            if prewarmed:
+                prewarmed[1].cleanup()
+            return
+        source = None
+        player.text_channel_id = interaction.channel.id
+
+        if player.queue:
+            if prewarmed and not start and player.peek() is prewarmed[0] and prewarmed[1].volume == player.volume \
+                    and prewarmed[1].filters == player.filters:
+                # The next track's FFmpeg is already running, swap straight over
+                source = prewarmed[1]
+            elif prewarmed:
+                # Skipped, the queue, the volume or the effects changed since it was warmed up
+                prewarmed[1].cleanup()
 
-            song_info = self.queue[interaction.guild.id].pop(0)
-            self.current_song[interaction.guild.id] = song_info
+            song_info = player.next_track()
 
             if song_info:
                 try:
                     # Fetch song metadata
                     song_title = song_info.get('title', 'Unknown Title')
-                    song_url = song_info.get('url')
-                    song_duration = song_info.get('duration', 'Unknown Duration')  # Duration info
+                    song_url = song_info.get('webpage_url')
+                    song_duration = format_duration(song_info.get('duration'))  # Duration info
                     thumbnail_url = song_info.get('thumbnail', '')  # Thumbnail image
 
-                    # Volume: Get the volume from the centralized dictionary
-                    current_volume = self.volume.get(interaction.guild.id, 1.0) * 100  # Volume in percentage
+                    if source is None:
+                        # Resolve the stream right before playing, stream URLs expire after a few hours
+                        stream = await self.find_stream(song_info)
+                        if stream is None:
+                            raise RuntimeError(f"Could not get a stream for {song_title}")
+
+                    # Volume: Get the volume from the guild's player
+                    current_volume = player.volume * 100  # Volume in percentage
 
                     # Create an embed for the Now Playing message
                     embed = discord.Embed(
@@ -128,149 +457,240 @@ class Play(commands.Cog):
                     embed.set_thumbnail(url=thumbnail_url)  # Set the thumbnail
                     embed.add_field(name="Duration", value=song_duration, inline=True)  # Add song duration
                     embed.add_field(name="Volume", value=f"{current_volume:.0f}%", inline=True)  # Add volume info
-                    embed.set_footer(text=f"Requested by {interaction.user.display_name}💕", icon_url=interaction.user.avatar.url)
+                    if player.filters:
+                        embed.add_field(name="Effects", value=", ".join(AUDIO_FILTERS[name][0] for name in player.filters), inline=True)
+                    embed.set_footer(text=f"Requested by {interaction.user.display_name}💕", icon_url=interaction.user.display_avatar.url)
 
-                    play_buttons = self.create_play_buttons()
-                    await interaction.channel.send(embed=embed, view=play_buttons)
+                    await self.update_panel(player, interaction.channel, embed, self.controls)
 
                     # Play the audio
-                    audio_source = discord.FFmpegPCMAudio(song_url, **FFMPEG_OPTIONS)
-                    audio_source = discord.PCMVolumeTransformer(audio_source, volume=self.volume.get(interaction.guild.id, 1.0))
+                    if source is None:
+                        source = create_audio_source(*stream, volume=player.volume, start=start, filters=player.filters)
+                    audio_source = PlaybackSource(source, volume=player.volume, start=start, speed=filter_graph(player.filters)[1])
+                    player.playback = audio_source
 
                     interaction.guild.voice_client.play(
                         audio_source,
                         after=lambda e: asyncio.run_coroutine_threadsafe(self.handle_after_play(interaction, e), self.bot.loop)
                     )
 
-                    self.is_playing[interaction.guild.id] = True
+                    player.transition(PLAYING)
+                    self.prefetch_next(player)
+                    self.schedule_prewarm(player, song_info, audio_source)
                 except Exception as e:
+                    if source is not None:
+                        source.cleanup()
                     print(f"Error playing the song: {e}")
                     await interaction.channel.send("Error occurred while trying to play the next song. 😢")
                     await self.play_next(interaction)
             else:
-                await interaction.channel.send("Queue is empty. 🌟")
-                self.is_playing[interaction.guild.id] = False
-                self.current_song.pop(interaction.guild.id, None)
+                await self.update_panel(player, interaction.channel, self.queue_empty_embed())
+                player.finish()
         else:
-            await interaction.channel.send("Queue is empty. 🌟")
-            self.is_playing[interaction.guild.id] = False
-            self.current_song.pop(interaction.guild.id, None)
+            await self.update_panel(player, interaction.channel, self.queue_empty_embed())
+            player.finish()
+
+    def queue_empty_embed(self):
+        return discord.Embed(title="Queue is empty. 🌟", description="Use /play to add more songs!", color=discord.Color.pink())
+
+    async def update_panel(self, player, channel, embed, view=None):
+        """Show `embed` on the guild's now-playing message, editing it in place when there is one in this channel."""
+        if player.panel is not None and player.panel.channel.id == channel.id:
+            try:
+                await player.panel.edit(embed=embed, view=view)
+                return
+            except discord.HTTPException:
+                pass  # Deleted or too old to edit, send a new one
+        try:
+            player.panel = await channel.send(embed=embed, view=view)
+        except discord.HTTPException as e:
+            print(f"Failed to send the now-playing message: {e}")
+            player.panel = None
+
+    def prefetch_next(self, player):
+        """Resolve the stream URLs of the next tracks in the background.
+
+        Skipped while shuffling, since the next track is only picked when the current one ends.
+        """
+        if player.shuffle:
+            return
+        # Tracks in the local audio cache don't need a stream URL
+        upcoming = [track for track in itertools.islice(player.queue, PREFETCH_TRACKS) if track['id'] not in audio_cache.entries]
+        if upcoming:
+            task = asyncio.create_task(prefetch_stream_urls(upcoming))
+            self.prefetches.add(task)
+            task.add_done_callback(self.prefetches.discard)
+
+    def schedule_prewarm(self, player, track, playback):
+        """Warm up the next track PREWARM_SECONDS before `track` ends. Needs the track's duration."""
+        if track.get('duration'):
+            player.prewarm_task = asyncio.create_task(self.prewarm_next(player, track, playback))
+
+    async def prewarm_next(self, player, track, playback):
+        # Follow the frames actually played, so pauses push the warm-up back
+        while (remaining := track['duration'] - playback.position) > PREWARM_SECONDS:
+            await asyncio.sleep(min(remaining - PREWARM_SECONDS, 5))
+
+        # Something may still get queued before the current track ends
+        while not player.queue and track['duration'] - playback.position > 1:
+            await asyncio.sleep(1)
+
+        if not player.queue or player.loop:
+            return
+        # With shuffle on this picks the next track now, so it can be warmed up
+        next_track = player.peek()
+
+        stream = await self.find_stream(next_track)
+        if stream is None:
+            return
+        starting = asyncio.ensure_future(asyncio.to_thread(PrewarmedAudio, *stream, player.volume, player.filters))
+        try:
+            source = await asyncio.shield(starting)
+        except asyncio.CancelledError:
+            # Don't leave the FFmpeg process behind once it has started
+            starting.add_done_callback(lambda done: done.result().cleanup() if not done.cancelled() and not done.exception() else None)
+            raise
+        player.prewarmed = (next_track, source)
+
+    def discard_prewarmed(self, player):
+        """Cancel a pending warm-up and stop an already warmed-up FFmpeg, e.g. on /stop."""
+        task, player.prewarm_task = player.prewarm_task, None
+        if task:
+            task.cancel()
+        prewarmed, player.prewarmed = player.prewarmed, None
+        if prewarmed:
+            prewarmed[1].cleanup()
+
+    async def stop_player(self, guild):
+        """Stop the music, disconnect and clear the guild's queue. Used by /stop and the Stop button."""
+        player = self.player(guild.id)
+        self.cancel_import(player)
+        self.discard_prewarmed(player)
+        player.stop()
+        await guild.voice_client.disconnect()
+        panel, player.panel = player.panel, None
+        if panel is not None:
+            # The session is over, take the buttons off its now-playing message
+            try:
+                await panel.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+    async def restart_at(self, guild, position):
+        """Respawn FFmpeg for the current track `position` seconds in and swap it in, without ending the track.
+
+        Input-side -ss makes FFmpeg jump straight there. Used by /seek, /volume and /filter. Returns
+        False if nothing is playing or the stream can't be found.
+        """
+        player = self.player(guild.id)
+        voice_client = guild.voice_client
+        if player.current is None or voice_client is None or not (voice_client.is_playing() or voice_client.is_paused()):
+            return False
+        track, current_playback = player.current, player.playback
+        duration = track.get('duration')
+        if duration:
+            position = min(position, max(duration - 1, 0))
+        stream = await self.find_stream(track)
+        # The track may have been skipped, ended or looped, or the bot disconnected while the stream was looked up
+        if stream is None or player.current is not track or player.playback is not current_playback \
+                or guild.voice_client is not voice_client or not self.is_busy(voice_client) or voice_client.source is None:
+            return False
+
+        source = create_audio_source(*stream, volume=player.volume, start=position, filters=player.filters)
+        playback = PlaybackSource(source, volume=player.volume, start=position, speed=filter_graph(player.filters)[1])
+        old = voice_client.source
+        paused = voice_client.is_paused()
+        voice_client.source = playback  # Keeps the after callback, so the queue carries on as usual
+        if paused:
+            voice_client.pause()  # Swapping the source resumes playback
+        # The audio thread may still be reading a frame from the old source, give it a moment before killing FFmpeg
+        asyncio.get_running_loop().call_later(1, old.cleanup)
+
+        player.playback = playback
+        self.discard_prewarmed(player)
+        self.schedule_prewarm(player, player.current, playback)
+        self.sessions.mark(guild.id, full=False)
+        return True
+
+    async def resume_interrupted(self, interaction):
+        """After (re)connecting to voice: continue a track a lost connection cut off, from where it stopped."""
+        player = self.players.get(interaction.guild.id)
+        if player is None or player.current is None or player.is_active or player.state == STOPPED:
+            return
+        voice_client = interaction.guild.voice_client
+        if voice_client is None or voice_client.is_playing() or voice_client.is_paused():
+            return
+        position = player.playback.position if player.playback else 0
+        player.requeue_interrupted()
+        player.transition(PLAYING)
+        await self.play_next(interaction, start=position)
+
+    def is_busy(self, voice_client):
+        return voice_client is not None and (voice_client.is_playing() or voice_client.is_paused())
 
     async def handle_after_play(self, interaction: discord.Interaction, error):
         if error:
             print(f"Playback error: {error}")
             await interaction.channel.send("An error occurred during playback. 😢")
 
-        if self.loop_all.get(interaction.guild.id, False):
-            self.queue[interaction.guild.id].append(self.current_song[interaction.guild.id])
-            await self.play_next(interaction)
-        elif self.loop.get(interaction.guild.id, False):
-            self.queue[interaction.guild.id].insert(0, self.current_song[interaction.guild.id])
-            await self.play_next(interaction)
-        else:
-            await self.play_next(interaction)
-
-    def create_play_buttons(self):
-        """Create buttons for music control commands."""
-        buttons = discord.ui.View()
-        
-        # Pause Button
-        pause_button = discord.ui.Button(label='Pause', style=discord.ButtonStyle.primary, custom_id='pause')
-        pause_button.callback = self.pause_song
-        buttons.add_item(pause_button)
-        
-        # Resume Button
-        resume_button = discord.ui.Button(label='Resume', style=discord.ButtonStyle.success, custom_id='resume')
-        resume_button.callback = self.resume_song
-        buttons.add_item(resume_button)
-
-        # Stop Button
-        stop_button = discord.ui.Button(label='Stop', style=discord.ButtonStyle.danger, custom_id='stop')
-        stop_button.callback = self.stop_song
-        buttons.add_item(stop_button)
-
-        # Skip Button using the exact functionality you provided
-        skip_button = discord.ui.Button(label='Skip', style=discord.ButtonStyle.secondary, custom_id='skip')
-        skip_button.callback = self.skip_song
-        buttons.add_item(skip_button)
-
-        # Shuffle Button
-        shuffle_button = discord.ui.Button(label='Shuffle', style=discord.ButtonStyle.secondary, custom_id='shuffle')
-        shuffle_button.callback = self.shuffle_song
-        buttons.add_item(shuffle_button)
-
-        # Loop Button
-        loop_button = discord.ui.Button(label='Loop', style=discord.ButtonStyle.secondary, custom_id='loop')
-        loop_button.callback = self.loop_song
-        buttons.add_item(loop_button)
-
-        # Loop All Button
-        loop_all_button = discord.ui.Button(label='Loop All', style=discord.ButtonStyle.secondary, custom_id='loop_all')
-        loop_all_button.callback = self.loop_all_songs
-        buttons.add_item(loop_all_button)
-
-        return buttons
+        if self.is_busy(interaction.guild.voice_client):
+            return  # The track that ended isn't the current one anymore, see play_next
+        player = self.player(interaction.guild.id)
+        if interaction.guild.voice_client is None and player.state != STOPPED:
+            # Disconnected mid-song (kicked or the connection dropped). Keep the track and its position,
+            # /join, /move or /play continue it from there.
+            player.interrupt()
+            return
+        if player.state != STOPPED:
+            player.requeue_current()
+        await self.play_next(interaction)
 
     async def skip_song(self, interaction: discord.Interaction):
         if interaction.guild.voice_client is None or not interaction.guild.voice_client.is_playing():
             await interaction.response.send_message("No song is currently playing! 🙅‍♂️")
             return
 
-        # Stop the currently playing audio
+        # Stopping the audio runs the after callback, which plays the next song
         interaction.guild.voice_client.stop()
-        # Wait for the current song to finish before playing the next one
         await interaction.response.send_message("Skipped the current song! 🎵 Moving to the next one...")
-        await interaction.guild.voice_client.wait_for("finished_playing") 
-        
-        # Play the next song
-        await self.bot.get_cog('Play').play_next(interaction)
 
     async def pause_song(self, interaction: discord.Interaction):
-        if interaction.guild.voice_client.is_playing():
+        if interaction.guild.voice_client and interaction.guild.voice_client.is_playing():
             interaction.guild.voice_client.pause()
+            self.player(interaction.guild.id).pause()
             await interaction.response.send_message("Paused the music! ⏸️")
         else:
             await interaction.response.send_message("No music is currently playing! 🙅‍♂️")
 
     async def resume_song(self, interaction: discord.Interaction):
-        if interaction.guild.voice_client.is_paused():
+        if interaction.guild.voice_client and interaction.guild.voice_client.is_paused():
             interaction.guild.voice_client.resume()
+            self.player(interaction.guild.id).resume()
             await interaction.response.send_message("Resumed the music! ▶️")
         else:
             await interaction.response.send_message("Music is not paused! 🥲")
 
     async def stop_song(self, interaction: discord.Interaction):
         if interaction.guild.voice_client is not None:
-            await interaction.guild.voice_client.disconnect()
-            self.queue[interaction.guild.id] = []
-            self.current_song.pop(interaction.guild.id, None)
+            await self.stop_player(interaction.guild)
             await interaction.response.send_message("Stopped the music and disconnected! 🛑")
         else:
             await interaction.response.send_message("Not connected to a voice channel! 🙅‍♂️")
 
     async def shuffle_song(self, interaction: discord.Interaction):
-        self.shuffle_active[interaction.guild.id] = not self.shuffle_active.get(interaction.guild.id, False)
-        if self.shuffle_active[interaction.guild.id]:
+        if self.player(interaction.guild.id).toggle_shuffle():
             await interaction.response.send_message("Shuffle mode is now **ON**! 🔀")
         else:
             await interaction.response.send_message("Shuffle mode is now **OFF**! 🔁")
 
     async def loop_song(self, interaction: discord.Interaction):
-        if interaction.guild.id not in self.loop:
-            self.loop[interaction.guild.id] = False
-
-        self.loop[interaction.guild.id] = not self.loop[interaction.guild.id]
-        if self.loop[interaction.guild.id]:
+        if self.player(interaction.guild.id).toggle_loop():
             await interaction.response.send_message("Looping current song! 🔄")
         else:
             await interaction.response.send_message("Looping disabled! 🚫")
 
     async def loop_all_songs(self, interaction: discord.Interaction):
-        if interaction.guild.id not in self.loop_all:
-            self.loop_all[interaction.guild.id] = False
-
-        self.loop_all[interaction.guild.id] = not self.loop_all[interaction.guild.id]
-        if self.loop_all[interaction.guild.id]:
+        if self.player(interaction.guild.id).toggle_loop_all():
             await interaction.response.send_message("Looping all songs in queue! 🔁")
         else:
             await interaction.response.send_message("Loop all disabled! 🚫")
@@ -0,0 +1,290 @@
+# Player_utils.py
+import itertools
+import os
+import random
+from collections import Counter, OrderedDict
+
+MAX_QUEUE_LENGTH = int(os.getenv("MAX_QUEUE_LENGTH", "500"))  # Tracks a guild can have queued at once, /queuelimit can lower it
+
+# Player states
+IDLE = "idle"        # Nothing playing, waiting for something to be queued
+PLAYING = "playing"  # A track is playing (or its stream is being set up)
+PAUSED = "paused"
+STOPPED = "stopped"  # /stop was used, the queue and modes were cleared
+
+TRANSITIONS = {
+    IDLE: {IDLE, PLAYING, STOPPED},
+    PLAYING: {PLAYING, PAUSED, IDLE, STOPPED},
+    PAUSED: {PLAYING, IDLE, STOPPED},
+    STOPPED: {PLAYING, IDLE, STOPPED},
+}
+
+class TrackQueue:
+    """Tracks in play order. Adding at either end, taking the next one and moving a random one to the front are all O(1).
+
+    The tracks sit in an OrderedDict under increasing keys, which keeps the order. The keys are also kept in a list,
+    with each key's index in `positions`, so a random key is one list lookup and removing one swaps the last key into its slot.
+    """
+
+    __slots__ = ("tracks", "keys", "positions", "counter")
+
+    def __init__(self, tracks=()):
+        self.tracks = OrderedDict()  # key -> track, in play order
+        self.keys = []  # The same keys in no particular order, for random picks
+        self.positions = {}  # key -> its index in `keys`
+        self.counter = itertools.count()
+        for track in tracks:
+            self.append(track)
+
+    def add_key(self, track):
+        key = next(self.counter)
+        self.tracks[key] = track
+        self.positions[key] = len(self.keys)
+        self.keys.append(key)
+        return key
+
+    def append(self, track):
+        self.add_key(track)
+
+    def appendleft(self, track):
+        self.tracks.move_to_end(self.add_key(track), last=False)
+
+    def popleft(self):
+        key, track = self.tracks.popitem(last=False)
+        index = self.positions.pop(key)
+        last = self.keys.pop()
+        if last != key:
+            # Swap-remove: the last key takes the removed key's slot
+            self.keys[index] = last
+            self.positions[last] = index
+        return track
+
+    def first(self):
+        return next(iter(self.tracks.values()))
+
+    def move_random_to_front(self):
+        """Put a track picked uniformly at random first. The others keep their order."""
+        self.tracks.move_to_end(random.choice(self.keys), last=False)
+
+    def clear(self):
+        self.tracks.clear()
+        self.keys.clear()
+        self.positions.clear()
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def __iter__(self):
+        return iter(self.tracks.values())
+
+class GuildPlayer:
+    """Everything the music commands know about one server: the queue, the current track and the play modes.
+
+    Adding tracks, taking the next one and the shuffle pick are all O(1), see TrackQueue. Shuffle doesn't reorder
+    the queue, the next track is drawn at random from what's left when it's needed, which walks a random permutation
+    lazily and keeps the queue's order for when shuffle is turned off again.
+    """
+
+    __slots__ = (
+        "guild_id", "queue", "current", "state", "loop", "loop_all", "shuffle", "volume", "filters",
+        "picked", "import_task", "prewarm_task", "prewarmed", "panel", "playback", "text_channel_id", "on_change",
+        "queued_ids", "max_queue",
+    )
+
+    def __init__(self, guild_id):
+        self.guild_id = guild_id
+        self.queue = TrackQueue()
+        self.current = None  # Track playing right now
+        self.state = IDLE
+        self.loop = False
+        self.loop_all = False
+        self.shuffle = False
+        self.volume = 1.0
+        self.filters = ()  # Audio effects, names from Music_utils.AUDIO_FILTERS
+        self.picked = False  # The head of the queue is the shuffled pick for the next track
+        self.import_task = None  # Running Spotify import, cancelled by /stop
+        self.prewarm_task = None  # Task waiting to warm up the next track
+        self.prewarmed = None  # (track, PrewarmedAudio) for the next track, started before the current one ends
+        self.panel = None  # This session's now-playing message, edited on every track change
+        self.playback = None  # PlaybackSource of the current track, for its position
+        self.text_channel_id = None  # Where the music was requested
+        self.on_change = None  # Called with the player when the queue, the modes or the volume change
+        self.queued_ids = Counter()  # Video ID -> times it's in the queue, for duplicate checks
+        self.max_queue = MAX_QUEUE_LENGTH  # This guild's queue cap, set with /queuelimit
+
+    def changed(self):
+        if self.on_change is not None:
+            self.on_change(self)
+
+    def transition(self, state):
+        if state not in TRANSITIONS[self.state]:
+            raise ValueError(f"Can't go from {self.state} to {state}")
+        self.state = state
+
+    @property
+    def is_active(self):
+        """Playing or paused, i.e. the next queued track will start on its own."""
+        return self.state in (PLAYING, PAUSED)
+
+    @property
+    def is_full(self):
+        return len(self.queue) >= self.max_queue
+
+    def contains(self, video_id):
+        """Whether a video is queued or playing."""
+        return self.queued_ids[video_id] > 0 or (self.current is not None and self.current.get('id') == video_id)
+
+    def append(self, track, left=False):
+        if left:
+            self.queue.appendleft(track)
+        else:
+            self.queue.append(track)
+        self.queued_ids[track.get('id')] += 1
+
+    def add(self, track, dedupe=False):
+        """Queue a track. Returns False when the queue is full, or with `dedupe` when the track is already there."""
+        if self.is_full or (dedupe and self.contains(track.get('id'))):
+            return False
+        self.append(track)
+        self.changed()
+        return True
+
+    def add_many(self, tracks, dedupe=False):
+        """Queue tracks up to the queue limit. Returns (added, skipped as duplicates or for lack of room)."""
+        added = 0
+        for track in tracks:
+            if self.is_full:
+                break
+            if dedupe and self.contains(track.get('id')):
+                continue
+            self.append(track)
+            added += 1
+        if added:
+            self.changed()
+        return added, len(tracks) - added
+
+    def peek(self):
+        """The track that will play next, or None. With shuffle on this is where it gets picked."""
+        if not self.queue:
+            return None
+        if self.shuffle and not self.picked:
+            self.queue.move_random_to_front()
+            self.picked = True
+        return self.queue.first()
+
+    def next_track(self):
+        """Take the next track off the queue and make it the current one. None if the queue is empty."""
+        track = self.peek()
+        if track is not None:
+            self.queue.popleft()
+            self.queued_ids[track.get('id')] -= 1
+            if not self.queued_ids[track.get('id')]:
+                del self.queued_ids[track.get('id')]
+            self.picked = False
+        self.current = track
+        self.changed()
+        return track
+
+    def requeue_current(self):
+        """After a track ends: queue it again for loop (next) or loop all (last)."""
+        if self.current is None:
+            return
+        if self.loop:
+            self.append(self.current, left=True)
+            self.picked = True
+        elif self.loop_all:
+            self.append(self.current)
+        self.changed()
+
+    def requeue_interrupted(self):
+        """Put the current track back at the front of the queue, to continue it after a reconnect."""
+        self.append(self.current, left=True)
+        self.picked = True
+        self.current = None
+
+    def toggle_shuffle(self):
+        self.shuffle = not self.shuffle
+        self.picked = False
+        self.changed()
+        return self.shuffle
+
+    def toggle_loop(self):
+        self.loop = not self.loop
+        self.changed()
+        return self.loop
+
+    def toggle_loop_all(self):
+        self.loop_all = not self.loop_all
+        self.changed()
+        return self.loop_all
+
+    def set_volume(self, volume):
+        self.volume = volume
+        self.changed()
+
+    def set_filters(self, filters):
+        self.filters = tuple(filters)
+        self.changed()
+
+    def pause(self):
+        """Returns False if nothing is playing."""
+        if self.state != PLAYING:
+            return False
+        self.transition(PAUSED)
+        return True
+
+    def resume(self):
+        """Returns False if not paused."""
+        if self.state != PAUSED:
+            return False
+        self.transition(PLAYING)
+        return True
+
+    def interrupt(self):
+        """The voice connection was lost mid-track. The track and its position are kept for a reconnect."""
+        self.transition(IDLE)
+
+    def finish(self):
+        """The queue ran out."""
+        self.current = None
+        self.playback = None
+        self.transition(IDLE)
+        self.changed()
+
+    def stop(self):
+        """Clear the queue, the current track and shuffle / loop all, like /stop always did."""
+        self.queue.clear()
+        self.queued_ids.clear()
+        self.current = None
+        self.playback = None
+        self.picked = False
+        self.loop_all = False
+        self.shuffle = False
+        self.transition(STOPPED)
+        self.changed()
+
+    def snapshot(self):
+        """The queue, current track, modes, volume and effects as a plain dict, for saving across restarts."""
+        return {
+            "queue": list(self.queue),
+            "current": self.current,
+            "loop": self.loop,
+            "loop_all": self.loop_all,
+            "shuffle": self.shuffle,
+            "volume": self.volume,
+            "filters": list(self.filters),
+        }
+
+    def restore(self, snapshot):
+        """Load a snapshot() back. The saved current track goes back to the front of the queue."""
+        self.queue = TrackQueue(snapshot.get("queue") or [])
+        self.queued_ids = Counter(track.get('id') for track in self.queue)
+        if snapshot.get("current"):
+            self.append(snapshot["current"], left=True)
+            self.picked = True  # Play it first even with shuffle on
+        self.current = None
+        self.loop = snapshot.get("loop", False)
+        self.loop_all = snapshot.get("loop_all", False)
+        self.shuffle = snapshot.get("shuffle", False)
+        self.volume = snapshot.get("volume", 1.0)
+        self.filters = tuple(snapshot.get("filters") or ())
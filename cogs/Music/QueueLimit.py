@@ -0,0 +1,26 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+from .Player_utils import MAX_QUEUE_LENGTH
+from utils.disabled_commands import check_if_disabled
+
+class QueueLimit(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name='queuelimit', description="Set how many songs this server can have queued at once.")
+    @app_commands.describe(limit=f"The most songs the queue can hold (up to {MAX_QUEUE_LENGTH})")
+    @app_commands.checks.has_permissions(administrator=True)
+    @check_if_disabled()
+    async def queuelimit(self, interaction: discord.Interaction, limit: app_commands.Range[int, 1, MAX_QUEUE_LENGTH]):
+        play_cog = self.bot.get_cog('Play')
+        limit = await play_cog.set_queue_limit(interaction.guild.id, limit)
+        await interaction.response.send_message(f"The queue can now hold up to {limit} songs! 📜")
+
+    @queuelimit.error
+    async def queuelimit_error(self, interaction: discord.Interaction, error):
+        if isinstance(error, app_commands.MissingPermissions):
+            await interaction.response.send_message("You need to be an administrator to change the queue limit! 🚫", ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(QueueLimit(bot))
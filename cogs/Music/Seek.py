@@ -0,0 +1,34 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+from .Music_utils import parse_timestamp, format_duration
+from utils.disabled_commands import check_if_disabled
+
+class Seek(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name='seek', description="Jump to a time in the current song.")
+    @app_commands.describe(position="A time like 1:30 or 90, or +15 / -15 to skip forward or back")
+    @check_if_disabled()
+    async def seek(self, interaction: discord.Interaction, position: str):
+        play_cog = self.bot.get_cog('Play')
+        player = play_cog.player(interaction.guild.id)
+        voice_client = interaction.guild.voice_client
+        if voice_client is None or player.current is None or not (voice_client.is_playing() or voice_client.is_paused()):
+            await interaction.response.send_message("No song is currently playing! 🙅‍♂️", ephemeral=True)
+            return
+
+        target = parse_timestamp(position, player.playback.position if player.playback else 0)
+        if target is None:
+            await interaction.response.send_message("Use a time like 1:30, 90 or +15! ⏩", ephemeral=True)
+            return
+
+        await interaction.response.defer()
+        if await play_cog.restart_at(interaction.guild, target):
+            await interaction.followup.send(f"Jumped to {format_duration(player.playback.position) if player.playback.position >= 1 else '0:00'}! ⏩")
+        else:
+            await interaction.followup.send("Could not seek in this song! 😢")
+
+async def setup(bot):
+    await bot.add_cog(Seek(bot))
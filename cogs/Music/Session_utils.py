@@ -0,0 +1,74 @@
+# Session_utils.py
+import os
+from datetime import datetime, timezone
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError
+
+# Music sessions are saved to MongoDB so a restart doesn't lose every guild's queue
+SESSION_FLUSH_SECONDS = int(os.getenv("SESSION_FLUSH_SECONDS", "10"))  # Also how stale a saved position can be
+MUSIC_RESUME = os.getenv("MUSIC_RESUME", "auto").lower()  # "auto", "offer" (ask with a button) or "off"
+RESUME_CONCURRENCY = int(os.getenv("RESUME_CONCURRENCY", "5"))  # Voice connections opened at once on startup
+RESUME_MAX_AGE = int(os.getenv("RESUME_MAX_AGE", str(6 * 3600)))  # Older sessions are dropped instead of resumed
+
+class SessionStore:
+    """Write-behind snapshots of every guild's music session in the `music_sessions` collection.
+
+    Changes only mark a guild as dirty. `flush()` (run every SESSION_FLUSH_SECONDS by the Play cog) writes
+    all dirty guilds in one bulk write: the whole session when the queue, modes or volume changed, just the
+    position otherwise, and a delete once the session is over. `snapshot(guild_id)` returns the document to
+    save, or None when there's nothing to resume.
+    """
+
+    def __init__(self, snapshot):
+        self.db = None
+        self.snapshot = snapshot
+        self.dirty = {}  # guild_id -> True for a full write, False for just the position
+
+    def set_database(self, db):
+        self.db = db
+
+    def mark(self, guild_id, full=True):
+        self.dirty[guild_id] = self.dirty.get(guild_id, False) or full
+
+    async def flush(self):
+        if self.db is None or not self.dirty:
+            return
+        dirty, self.dirty = self.dirty, {}
+        now = datetime.now(timezone.utc)
+        operations = []
+        for guild_id, full in dirty.items():
+            doc = self.snapshot(guild_id)
+            if doc is None:
+                operations.append(DeleteOne({"_id": guild_id}))
+            elif full:
+                operations.append(ReplaceOne({"_id": guild_id}, {**doc, "updated_at": now}, upsert=True))
+            else:
+                operations.append(UpdateOne({"_id": guild_id}, {"$set": {"position": doc["position"], "updated_at": now}}))
+        try:
+            await self.db.music_sessions.bulk_write(operations, ordered=False)
+        except PyMongoError as e:
+            print(f"Failed to save music sessions: {e}")
+            # Try again on the next flush, unless newer changes were marked meanwhile
+            for guild_id, full in dirty.items():
+                self.mark(guild_id, full)
+
+    async def load(self):
+        """Every saved session, dropping the ones older than RESUME_MAX_AGE."""
+        if self.db is None:
+            return []
+        try:
+            docs = await self.db.music_sessions.find({}).to_list(None)
+        except PyMongoError as e:
+            print(f"Failed to load music sessions: {e}")
+            return []
+        now = datetime.now(timezone.utc)
+        fresh = []
+        for doc in docs:
+            updated_at = doc.get("updated_at")
+            if updated_at and updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)  # pymongo returns naive UTC datetimes
+            if updated_at and (now - updated_at).total_seconds() <= RESUME_MAX_AGE:
+                fresh.append(doc)
+            else:
+                self.mark(doc["_id"])
+        return fresh
@@ -4,41 +4,11 @@ from discord import app_commands
 import yt_dlp as youtube_dl
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
-import os
 import json 
 import random
 import asyncio
 from .Music_utils import *
-from pymongo import MongoClient
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-MONGODB_URI = os.getenv("MONGODB_URI")
-
-client = MongoClient(MONGODB_URI)
-db = client["Slavie"]  # Database name
-disabled_commands_col = db.disabled_commands
-
-def load_disabled_commands():
-    """Load the disabled commands from MongoDB."""
-    return disabled_commands_col.find_one({"guild_id": str(os.getenv("GUILD_ID"))}) or {}
-
-async def is_command_disabled(guild_id, command_name):
-    """Check if a command is disabled for a specific guild."""
-    disabled_commands = disabled_commands_col.find_one({"guild_id": str(guild_id)})
-    return disabled_commands and command_name in disabled_commands.get("commands", [])
-
-# Custom check function to disable commands
-def check_if_disabled():
-    async def predicate(interaction: discord.Interaction) -> bool:
-        guild_id = interaction.guild.id
-        command_name = interaction.command.name
-        if await is_command_disabled(guild_id, command_name):
-            await interaction.response.send_message(f"The command `{command_name}` is disabled in this server.", ephemeral=True)
-            return False  # Prevents the slash command from executing
-        return True
-    return app_commands.check(predicate)
+from utils.disabled_commands import check_if_disabled
 
 class Volume(commands.Cog):
     def __init__(self, bot, play_cog):
@@ -57,11 +27,15 @@ class Volume(commands.Cog):
                 # Adjust the volume so that 100% is 10%
                 scaled_volume = (level / 100) * 0.1
                 
-                # Set the volume in both the voice client and the Play cog's volume dictionary
-                interaction.guild.voice_client.source.volume = scaled_volume
-                self.play_cog.volume[interaction.guild.id] = scaled_volume  # Update the volume in Play cog
-                
+                # Set the volume in both the voice client and the guild's player
+                source = interaction.guild.voice_client.source
+                source.volume = scaled_volume
+                self.play_cog.player(interaction.guild.id).set_volume(scaled_volume)  # Used for the next songs too
+
                 await interaction.response.send_message(f"Volume set to {level}% 🔊 (Scaled to {scaled_volume * 100:.1f}% of max volume)")
+                if not getattr(source, "live_volume", True):
+                    # Opus passthrough: the volume is part of the FFmpeg command, restart it where the song is now
+                    await self.play_cog.restart_at(interaction.guild, source.position)
             else:
                 await interaction.response.send_message("No song is playing to adjust the volume! 😅", ephemeral=True)
         else:
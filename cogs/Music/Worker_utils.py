@@ -0,0 +1,134 @@
+# Worker_utils.py
+import asyncio
+import itertools
+import json
+import os
+import zlib
+
+# Optional extraction workers: separate processes (see extraction_worker.py) that run yt-dlp extraction, so it doesn't compete
+# with the gateway for this process's GIL. Only extraction moves there, the voice connections, FFmpeg and Opus frame pacing
+# stay in the bot process. Comma-separated host:port list, empty runs everything in-process.
+EXTRACTION_WORKERS = [address.strip() for address in os.getenv("EXTRACTION_WORKERS", "").split(",") if address.strip()]
+WORKER_HEALTH_SECONDS = float(os.getenv("WORKER_HEALTH_SECONDS", "5"))  # Ping interval, also the ping timeout
+# Seconds to wait for a worker's extraction. At most half the caller's timeout, so the in-process fallback still has time
+WORKER_TIMEOUT = float(os.getenv("WORKER_TIMEOUT", "8"))
+
+class WorkerError(Exception):
+    """The worker couldn't be reached: not connected, connection lost or no answer in time."""
+
+class ExtractionWorker:
+    """Connection to one extraction worker, speaking newline-delimited JSON: {"id", "op", ...} -> {"id", "ok", "result"/"error"}.
+
+    `run()` keeps the connection up and pings the worker every WORKER_HEALTH_SECONDS. The worker counts as healthy
+    only while it answers.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        host, port = address.rsplit(":", 1)
+        self.host = host
+        self.port = int(port)
+        self.reader = None
+        self.writer = None
+        self.pending = {}  # Request id -> future for its response
+        self.ids = itertools.count(1)
+        self.healthy = False
+        self.task = None
+
+    async def run(self):
+        while True:
+            try:
+                self.reader, self.writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), WORKER_HEALTH_SECONDS)
+            except (asyncio.TimeoutError, OSError):
+                await asyncio.sleep(WORKER_HEALTH_SECONDS)
+                continue
+
+            receiver = asyncio.create_task(self.receive())
+            try:
+                while not receiver.done():
+                    await self.request("ping", WORKER_HEALTH_SECONDS)
+                    if not self.healthy:
+                        print(f"Extraction worker {self.address} is up")
+                    self.healthy = True
+                    await asyncio.sleep(WORKER_HEALTH_SECONDS)
+            except WorkerError as e:
+                print(f"Extraction worker {self.address} stopped answering: {e}")
+            finally:
+                if self.healthy:
+                    print(f"Extraction worker {self.address} is down, extracting in-process until it's back")
+                self.healthy = False
+                receiver.cancel()
+                self.writer.close()
+                self.writer = None
+                for future in self.pending.values():
+                    if not future.done():
+                        future.set_exception(WorkerError("connection lost"))
+                self.pending.clear()
+            await asyncio.sleep(WORKER_HEALTH_SECONDS)
+
+    async def receive(self):
+        try:
+            while line := await self.reader.readline():
+                message = json.loads(line)
+                future = self.pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    continue  # Its caller gave up already
+                if message.get("ok"):
+                    future.set_result(message.get("result"))
+                else:
+                    # The worker is fine, the request itself failed (e.g. the video is unavailable)
+                    future.set_exception(RuntimeError(message.get("error", "unknown error")))
+        except (OSError, ValueError) as e:
+            print(f"Lost the connection to extraction worker {self.address}: {e}")
+
+    async def request(self, op, timeout, **payload):
+        if self.writer is None or self.writer.is_closing():
+            raise WorkerError("not connected")
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        try:
+            self.writer.write(json.dumps({"id": request_id, "op": op, **payload}).encode() + b"\n")
+            await self.writer.drain()
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise WorkerError(f"no answer to {op} in {timeout:.0f}s")
+        except OSError as e:
+            raise WorkerError(str(e))
+        finally:
+            self.pending.pop(request_id, None)
+
+class WorkerPool:
+    """All configured extraction workers. Requests are sharded by key, and go to the next healthy worker when their own is down."""
+
+    def __init__(self, addresses):
+        self.workers = [ExtractionWorker(address) for address in addresses]
+
+    @property
+    def enabled(self):
+        return bool(self.workers)
+
+    def start(self):
+        """Connect to every worker and start the health checks. Called from Play.cog_load."""
+        for worker in self.workers:
+            if worker.task is None:
+                worker.task = asyncio.create_task(worker.run())
+
+    def close(self):
+        for worker in self.workers:
+            if worker.task is not None:
+                worker.task.cancel()
+                worker.task = None
+
+    def pick(self, key):
+        """The worker that should handle `key`, or None when every worker is down."""
+        if not self.workers:
+            return None
+        shard = zlib.crc32(key.encode()) % len(self.workers)
+        for offset in range(len(self.workers)):
+            worker = self.workers[(shard + offset) % len(self.workers)]
+            if worker.healthy:
+                return worker
+        return None
+
+extraction_workers = WorkerPool(EXTRACTION_WORKERS)
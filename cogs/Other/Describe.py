@@ -5,55 +5,49 @@ from PIL import Image
 import io
 import aiohttp
 import os
-from transformers import BlipProcessor, BlipForConditionalGeneration
-import torch
-from pymongo import MongoClient
 from dotenv import load_dotenv
+from utils.lazy_resource import LazyResource
 
 # Load environment variables from .env file
 load_dotenv()
-MONGODB_URI = os.getenv("MONGODB_URI")
-
-client = MongoClient(MONGODB_URI)
-db = client["Slavie"]  # Database name
-disabled_commands_col = db.disabled_commands
-
-def load_disabled_commands():
-    """Load the disabled commands from MongoDB."""
-    return disabled_commands_col.find_one({"guild_id": str(os.getenv("GUILD_ID"))}) or {}
-
-async def is_command_disabled(guild_id, command_name):
-    """Check if a command is disabled for a specific guild."""
-    disabled_commands = disabled_commands_col.find_one({"guild_id": str(guild_id)})
-    return disabled_commands and command_name in disabled_commands.get("commands", [])
-
-# Custom check function to disable commands
-def check_if_disabled():
-    async def predicate(interaction: discord.Interaction) -> bool:
-        guild_id = interaction.guild.id
-        command_name = interaction.command.name
-        if await is_command_disabled(guild_id, command_name):
-            await interaction.response.send_message(f"The command `{command_name}` is disabled in this server.", ephemeral=True)
-            return False  # Prevents the slash command from executing
-        return True
-    return app_commands.check(predicate)
+
+MODEL_NAME = "Salesforce/blip-image-captioning-large"
+# Load the model in the background once the bot is ready instead of on the first /describe
+WARM_UP = os.getenv("DESCRIBE_WARM_UP", "false").lower() == "true"
+# Free the model again after this many seconds without a /describe (0 keeps it loaded)
+IDLE_TIMEOUT = int(os.getenv("DESCRIBE_IDLE_TIMEOUT", "1800"))
+
+def load_blip():
+    """Load the BLIP model and processor. torch/transformers are imported here so startup doesn't pay for them."""
+    import torch
+    from transformers import BlipProcessor, BlipForConditionalGeneration
+
+    processor = BlipProcessor.from_pretrained(MODEL_NAME)
+    model = BlipForConditionalGeneration.from_pretrained(MODEL_NAME)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model.to(device)
+    return processor, model, device
+
+def free_blip():
+    import torch
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
 
 class DescribeCog(commands.Cog):
     """A Cog for describing images using AI."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        # Load the BLIP model and processor
-        model_name = "Salesforce/blip-image-captioning-large"
-        try:
-            self.processor = BlipProcessor.from_pretrained(model_name)
-            self.model = BlipForConditionalGeneration.from_pretrained(model_name)
-            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-            self.model.to(self.device)
-        except Exception as e:
-            print(f"Failed to load the image captioning model: {e}")
-            self.model = None
-            self.processor = None
+        # The BLIP model is loaded on first use (or warm-up), not at startup
+        self.blip = LazyResource("image captioning model", load_blip, free_blip, idle_timeout=IDLE_TIMEOUT or None)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if WARM_UP and not self.blip.loaded:
+            self.blip.warm_up()
+
+    def cog_unload(self):
+        self.blip.close()
 
     @app_commands.command(name="describe", description="Describe an image using AI.")
     @app_commands.describe(
@@ -67,7 +61,10 @@ class DescribeCog(commands.Cog):
             await interaction.followup.send("❌ Please provide a valid image file.", ephemeral=True)
             return
 
-        if not self.model or not self.processor:
+        try:
+            processor, model, device = await self.blip.get()
+        except Exception as e:
+            print(f"Failed to load the image captioning model: {e}")
             await interaction.followup.send("❌ Image description service is currently unavailable.", ephemeral=True)
             return
 
@@ -84,17 +81,17 @@ class DescribeCog(commands.Cog):
             image_pil = Image.open(io.BytesIO(img_bytes)).convert("RGB")
 
             # Preprocess the image
-            inputs = self.processor(images=image_pil, return_tensors="pt").to(self.device)
+            inputs = processor(images=image_pil, return_tensors="pt").to(device)
 
             # Generate a more detailed caption
-            out = self.model.generate(
+            out = model.generate(
                 **inputs,
                 max_length=150,                # Increased max_length for more detailed descriptions
                 num_beams=10,                  # Increased num_beams for better quality
                 no_repeat_ngram_size=3,        # Prevents repetition
                 early_stopping=True
             )
-            caption = self.processor.decode(out[0], skip_special_tokens=True)
+            caption = processor.decode(out[0], skip_special_tokens=True)
 
             # Create an embed with the image and detailed description
             embed = discord.Embed(
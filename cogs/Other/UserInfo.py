@@ -1,42 +1,10 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import os
 import requests
 from io import BytesIO
 from colorthief import ColorThief
-from pymongo import MongoClient
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-MONGODB_URI = os.getenv("MONGODB_URI")
-
-client = MongoClient(MONGODB_URI)
-db = client["Slavie"]  # Database name
-disabled_commands_col = db.disabled_commands
-marriages_col = db.marriages
-adoptions_col = db.adoptions
-
-def load_disabled_commands():
-    """Load the disabled commands from MongoDB."""
-    return disabled_commands_col.find_one({"guild_id": str(os.getenv("GUILD_ID"))}) or {}
-
-async def is_command_disabled(guild_id, command_name):
-    """Check if a command is disabled for a specific guild."""
-    disabled_commands = disabled_commands_col.find_one({"guild_id": str(guild_id)})
-    return disabled_commands and command_name in disabled_commands.get("commands", [])
-
-# Custom check function to disable commands
-def check_if_disabled():
-    async def predicate(interaction: discord.Interaction) -> bool:
-        guild_id = interaction.guild.id
-        command_name = interaction.command.name
-        if await is_command_disabled(guild_id, command_name):
-            await interaction.response.send_message(f"The command `{command_name}` is disabled in this server.", ephemeral=True)
-            return False  # Prevents the slash command from executing
-        return True
-    return app_commands.check(predicate)
+from utils.disabled_commands import check_if_disabled
 
 class UserInfoCog(commands.Cog):
     def __init__(self, bot):
@@ -111,9 +79,9 @@ class UserInfoCog(commands.Cog):
         embedded_msg = discord.Embed(title='👨‍👩‍👦 Family Information 👨‍👩‍👦', color=avatar_color)
         embedded_msg.set_thumbnail(url=member.avatar.url)
 
-        spouse_data = marriages_col.find_one({"user_id": str(member.id)})
-        children_data = adoptions_col.find({"adopted_by": str(member.id)})
-        adoption_data = adoptions_col.find_one({"user_id": str(member.id)})
+        spouse_data = await self.bot.db.marriages.find_one({"user_id": str(member.id)})
+        children_data = self.bot.db.adoptions.find({"adopted_by": str(member.id)})
+        adoption_data = await self.bot.db.adoptions.find_one({"user_id": str(member.id)})
 
         spouse_id = spouse_data.get("married_to") if spouse_data else None
         children_mentions = []
@@ -132,7 +100,7 @@ class UserInfoCog(commands.Cog):
         else:
             embedded_msg.add_field(name='Spouse:', value="Not married", inline=False)
 
-        children = [child for child in children_data]
+        children = [child async for child in children_data]
         if children:
             for child in children:
                 child_id = child["user_id"]
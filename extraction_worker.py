@@ -0,0 +1,60 @@
+# /bot/extraction_worker.py
+"""Extraction worker: runs the bot's yt-dlp extraction in a separate process, so it has its own GIL and event loop.
+Playback (voice, FFmpeg and Opus frame pacing) stays in the bot.
+
+    python extraction_worker.py --port 9200
+
+Point the bot at it with EXTRACTION_WORKERS=127.0.0.1:9200. Several workers can be listed comma-separated, searches
+are sharded between them. When no worker answers the bot extracts in-process again, so workers can be restarted
+at any time.
+"""
+import argparse
+import asyncio
+import json
+from cogs.Music.Music_utils import extract_youtube_info, ytdl_pool
+
+async def handle(reader, writer):
+    loop = asyncio.get_running_loop()
+    running = set()
+
+    async def respond(message):
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+    async def run(request):
+        try:
+            if request["op"] == "ping":
+                result = "pong"
+            elif request["op"] == "extract":
+                result = await loop.run_in_executor(ytdl_pool, extract_youtube_info, request["target"])
+            else:
+                raise ValueError(f"unknown op {request['op']!r}")
+            await respond({"id": request["id"], "ok": True, "result": result})
+        except OSError:
+            pass  # The bot disconnected
+        except Exception as e:
+            await respond({"id": request["id"], "ok": False, "error": str(e)})
+
+    try:
+        while line := await reader.readline():
+            task = asyncio.create_task(run(json.loads(line)))
+            running.add(task)
+            task.add_done_callback(running.discard)
+    except (OSError, ValueError) as e:
+        print(f"Dropped a connection: {e}")
+    finally:
+        writer.close()
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run an extraction worker for the bot.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    args = parser.parse_args()
+
+    server = await asyncio.start_server(handle, args.host, args.port)
+    print(f"Extraction worker listening on {args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    asyncio.run(main())
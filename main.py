@@ -1,10 +1,19 @@
 import discord
 from discord import Embed
-from discord.ext import commands, tasks
+from discord.ext import commands
 import os
 import asyncio
 import traceback
+import time
 from dotenv import load_dotenv
+from utils.database import Database
+from utils.disabled_commands import DisabledCommands
+from utils.cog_loader import load_cogs, format_report, format_summary
+from utils.command_sync import CommandSync
+from utils.presence import PresenceScheduler
+from utils.log_sink import ChannelLogSink
+from utils.loop_watchdog import LoopWatchdog
+from utils.metrics import MetricsCommandTree, start_metrics_server
 
 author_id = 734521077744664588
 author2_id = 1194399742516531222
@@ -17,34 +26,74 @@ intents = discord.Intents.all()
 intents.message_content = True
 intents.guilds = True
 intents.presences = True
-bot = commands.Bot(command_prefix="`", intents=intents)
+# MetricsCommandTree records per-command counts, errors and latency
+bot = commands.Bot(command_prefix="`", intents=intents, tree_cls=MetricsCommandTree)
+
+# Shared async MongoDB connection pool, handed to every cog as `bot.db`
+bot.db = Database()
+# Per-guild disabled commands, kept in memory so checks never hit the database
+bot.disabled_commands = DisabledCommands(bot.db)
+# Global slash command sync, skipped when the command tree hasn't changed
+bot.command_sync = CommandSync(bot)
 
 # Change this to the channel ID where you want to send logs
 LOG_CHANNEL_ID = 1298320581464162387  # Updated to your specified channel ID
-log_channel = None
+
+# Log lines are queued and sent in batches by a background task, and mirrored to logs/bot.log
+log_sink = ChannelLogSink(
+    bot,
+    LOG_CHANNEL_ID,
+    max_queue=int(os.getenv("LOG_QUEUE_SIZE", "1000")),
+    flush_interval=float(os.getenv("LOG_FLUSH_INTERVAL", "2")),
+    drop_policy=os.getenv("LOG_DROP_POLICY", "oldest"),
+    log_file=os.getenv("LOG_FILE", "logs/bot.log"),
+)
+bot.log_sink = log_sink
+
+# Records what blocks the event loop for longer than the threshold, see the `stalls owner command
+bot.loop_watchdog = LoopWatchdog(threshold=float(os.getenv("LOOP_STALL_THRESHOLD", "0.25")))
 
 # Track the bot's start time
 start_time = None
 
-@tasks.loop()
-async def update_status():
-    activity = discord.Activity(
-        type=discord.ActivityType.playing, 
-        name=f"/help"
-    )
-    await bot.change_presence(activity=activity)
+# Cog load summary, sent to the log channel once it is available
+cog_load_summary = None
+
+# Set after the first on_ready, reconnects fire on_ready again
+ready_once = False
+
+# Rotating status, only sent to Discord when the rendered text changes
+STATUS_INTERVAL = int(os.getenv("STATUS_INTERVAL", "60"))  # Seconds between status rotations
+STATUS_ACTIVITIES = [
+    (discord.ActivityType.playing, "/help"),
+    (discord.ActivityType.watching, "{guilds} servers"),
+    (discord.ActivityType.listening, "music in {queues} servers"),
+    (discord.ActivityType.playing, "for {uptime}"),
+]
+bot.presence = PresenceScheduler(bot, STATUS_ACTIVITIES, interval=STATUS_INTERVAL)
 
 @bot.event
 async def on_ready():
-    global log_channel, start_time
-    log_channel = bot.get_channel(LOG_CHANNEL_ID)  # Get the log channel
+    global start_time, cog_load_summary, ready_once
+
+    # on_ready also fires on reconnects, only sync and announce once per process
+    if ready_once:
+        return
+    ready_once = True
 
+    synced_commands = []
+    sync_skipped = False
     try:
-        # Sync commands globally
-        synced_commands = await bot.tree.sync(guild=None)  # `guild=None` syncs globally
-        print(f"Synced {len(synced_commands)} commands globally")
+        # Sync commands globally, unless they are the same as the last sync
+        synced = await bot.command_sync.sync()
+        if synced is None:
+            sync_skipped = True
+            print("Command tree unchanged, skipped syncing")
+        else:
+            synced_commands = synced
+            print(f"Synced {len(synced_commands)} commands globally")
     except Exception as e:
-        await log_to_channel("An error with syncing application commands has occurred: " + str(e))
+        log_to_channel("An error with syncing application commands has occurred: " + str(e))
         print("An error with syncing application commands has occurred: ", e)
 
     print("-------------")
@@ -63,7 +112,9 @@ async def on_ready():
     embed.set_author(name=bot.user.name, icon_url=bot.user.avatar.url)
 
     # Add additional fields for clarity
-    if len(synced_commands) > 1:
+    if sync_skipped:
+        embed.add_field(name="🔄 Synced Commands", value="Commands are unchanged, no sync needed", inline=False)
+    elif len(synced_commands) > 1:
         embed.add_field(name="🔄 Synced Commands", value=f"{len(synced_commands)} commands have been synced successfully", inline=False)
     elif len(synced_commands) == 1:
         embed.add_field(name="🔄 Synced Commands", value=f"{len(synced_commands)} command has been synced successfully", inline=False)
@@ -77,17 +128,23 @@ async def on_ready():
     embed.set_footer(text=f"Bot created by mohamed_elmecky💞", icon_url=user.avatar.url)
 
     # Log the embed to the channel
-    await log_to_channel(embed)
+    log_to_channel(embed)
+
+    # Send the cog load summary once, not again on reconnects
+    if cog_load_summary:
+        log_to_channel(cog_load_summary)
+        cog_load_summary = None
 
-    # Start the status updater task
-    update_status.start()
+    # Start rotating the bot's status
+    bot.presence.start()
 
-async def log_to_channel(message):
-    if log_channel:
-        try:
-            await log_channel.send(embed=message) if isinstance(message, Embed) else await log_channel.send(message)
-        except Exception as e:
-            print(f"Failed to send log to channel: {e}")
+def log_to_channel(message):
+    """Queue a message or Embed for the log channel, it is sent in the background."""
+    log_sink.log(message)
+
+@bot.event
+async def on_app_command_completion(interaction, command):
+    bot.tree.record(interaction, command.qualified_name)
 
 @bot.event
 async def on_command_error(ctx, error):
@@ -101,32 +158,48 @@ async def on_command_error(ctx, error):
     traceback.print_exception(type(error), error, error.__traceback__)
 
 async def load():
+    global cog_load_summary
     # Load all cogs
-    directories = ["Author", "Interactions", "Moderation", "Other", "EvilAuthorShit"]
-    
-    for directory in directories:
-        await log_to_channel(f"Loading {directory}...")
-        print(f"Loading {directory}")
-        for filename in os.listdir(f"./cogs/{directory}"):
-            if filename.endswith(".py") and filename != "__init__.py" and not filename.endswith("utils.py"):
-                cog = f"cogs.{directory}.{filename[:-3]}"
-                try:
-                    module = __import__(cog, fromlist=['setup'])
-                    await module.setup(bot)
-                    await log_to_channel(f"Successfully loaded {cog}.")
-                except Exception as e:
-                    await log_to_channel(f"Failed to load {cog}: {e}")
-                    print(f"Failed to load {cog}: {e}")
+    directories = ["Author", "Interactions", "Moderation", "Music", "Other", "EvilAuthorShit"]
+
+    print(f"Loading {', '.join(directories)}")
+    started = time.perf_counter()
+    report = await load_cogs(bot, directories)
+    total = time.perf_counter() - started
+
+    print(format_report(report, total))
+    cog_load_summary = format_summary(report, total)
 
 async def main():
+    metrics_server = None
     try:
+        await bot.db.connect()
+        await bot.disabled_commands.warm()
+        bot.disabled_commands.start_watching()
+        log_sink.start()
+        bot.loop_watchdog.start()
         await load()  
+        # Prometheus metrics on http://127.0.0.1:<port>/metrics, set METRICS_PORT=0 to turn it off
+        metrics_port = int(os.getenv("METRICS_PORT", "9108"))
+        if metrics_port:
+            metrics_server = await start_metrics_server(port=metrics_port)
         token = os.getenv("Token")  # Use your actual token here
         await bot.start(token)
     except Exception as e:
         print(f"An error occurred during startup: {e}")
     finally:
+        play_cog = bot.get_cog("Play")
+        if play_cog is not None:
+            # Save the music queues so they can be resumed on the next start
+            await play_cog.save_all_sessions()
+        bot.presence.stop()
+        bot.loop_watchdog.stop()
+        await log_sink.stop()
         await bot.close()  # Ensure the bot is closed properly
+        if metrics_server is not None:
+            await metrics_server.cleanup()
+        bot.disabled_commands.stop_watching()
+        await bot.db.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,167 @@
+# /bot/utils/cog_loader.py
+import ast
+import asyncio
+import importlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+COGS_ROOT = "cogs"
+
+def discover_cogs(directories, root=COGS_ROOT):
+    """Return {module name: file path} for every cog file in the given directories, in a stable order."""
+    cogs = {}
+    for directory in directories:
+        for filename in sorted(os.listdir(os.path.join(root, directory))):
+            if filename.endswith(".py") and filename != "__init__.py" and not filename.endswith("utils.py"):
+                cogs[f"{root}.{directory}.{filename[:-3]}"] = os.path.join(root, directory, filename)
+    return cogs
+
+def is_helper_module(module_name, root=COGS_ROOT):
+    """Shared non-cog modules under the cogs folder, e.g. cogs.Music.Music_utils."""
+    return module_name.startswith(f"{root}.") and os.path.isfile(module_name.replace(".", os.sep) + ".py")
+
+def find_dependencies(module_name, path, cogs, cog_classes):
+    """Find what a cog needs first: the cogs and shared helper modules it imports, and cogs its setup() looks up with get_cog()."""
+    with open(path, "r", encoding="utf-8") as file:
+        tree = ast.parse(file.read(), filename=path)
+
+    package = module_name.rsplit(".", 1)[0]
+    deps = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package.rsplit(".", node.level - 1)[0] if node.level > 1 else package
+                target = f"{base}.{node.module}" if node.module else base
+            else:
+                target = node.module or ""
+            deps.add(target)
+            deps.update(f"{target}.{alias.name}" for alias in node.names)
+        elif isinstance(node, ast.Import):
+            deps.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.AsyncFunctionDef) and node.name == "setup":
+            for call in ast.walk(node):
+                if (isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute) and call.func.attr == "get_cog"
+                        and call.args and isinstance(call.args[0], ast.Constant) and call.args[0].value in cog_classes):
+                    deps.add(cog_classes[call.args[0].value])
+
+    return sorted(dep for dep in deps if dep != module_name and (dep in cogs or is_helper_module(dep)))
+
+def resolve_order(cogs):
+    """Order cogs so every cog comes after its dependencies; ties keep discovery order."""
+    cog_classes = {}
+    for module_name, path in cogs.items():
+        with open(path, "r", encoding="utf-8") as file:
+            tree = ast.parse(file.read(), filename=path)
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef):
+                cog_classes.setdefault(node.name, module_name)
+
+    deps = {name: find_dependencies(name, path, cogs, cog_classes) for name, path in cogs.items()}
+    order, done = [], {dep for cog_deps in deps.values() for dep in cog_deps if dep not in cogs}
+    pending = list(cogs)
+    while pending:
+        ready = [name for name in pending if all(dep in done for dep in deps[name])]
+        if not ready:
+            # Circular dependency, load the rest in discovery order
+            ready = pending[:]
+        for name in ready:
+            order.append(name)
+            done.add(name)
+            pending.remove(name)
+    return order, deps
+
+def timed_import(module_name):
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    return module, time.perf_counter() - start
+
+async def load_cogs(bot, directories, max_workers=8):
+    """Import cogs concurrently in a thread pool, then run their setup() one by one in dependency order.
+
+    Shared helper modules are imported first so cogs importing them in parallel never see them half-initialised.
+
+    Returns one report row per cog: {"cog", "import", "setup", "error"} with times in seconds.
+    """
+    cogs = discover_cogs(directories)
+    order, deps = resolve_order(cogs)
+    loop = asyncio.get_running_loop()
+    report = []
+    failed = set()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cog-import") as pool:
+        helpers = sorted({dep for cog_deps in deps.values() for dep in cog_deps if dep not in cogs})
+        results = await asyncio.gather(*(loop.run_in_executor(pool, timed_import, name) for name in helpers), return_exceptions=True)
+        for name, result in zip(helpers, results):
+            if isinstance(result, Exception):
+                report.append({"cog": name, "import": None, "setup": None, "error": f"import failed: {result}"})
+                failed.add(name)
+
+        imports = {name: loop.run_in_executor(pool, timed_import, name) for name in order if not any(dep in failed for dep in deps[name])}
+
+        for name in order:
+            row = {"cog": name, "import": None, "setup": None, "error": None}
+            report.append(row)
+            failed_deps = [dep for dep in deps[name] if dep in failed]
+            if name in imports:
+                try:
+                    module, row["import"] = await imports[name]
+                except Exception as e:
+                    row["error"] = f"import failed: {e}"
+                    failed.add(name)
+                    continue
+
+            if failed_deps:
+                row["error"] = f"dependency failed: {', '.join(failed_deps)}"
+                failed.add(name)
+                continue
+
+            start = time.perf_counter()
+            try:
+                await module.setup(bot)
+            except Exception as e:
+                row["error"] = f"setup failed: {e}"
+                failed.add(name)
+            row["setup"] = time.perf_counter() - start
+
+    return report
+
+def format_ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f} ms"
+
+def format_report(report, total=None):
+    """Format the full per-cog timing table."""
+    width = max([len(row["cog"]) for row in report] + [3])
+    lines = [f"{'Cog':<{width}}  {'Import':>8}  {'Setup':>8}  Status"]
+    for row in report:
+        lines.append(f"{row['cog']:<{width}}  {format_ms(row['import']):>8}  {format_ms(row['setup']):>8}  {row['error'] or 'ok'}")
+    lines.append(format_totals(report, total))
+    return "\n".join(lines)
+
+def format_totals(report, total=None):
+    loaded = sum(1 for row in report if not row["error"])
+    line = f"Loaded {loaded}/{len(report)} cogs"
+    if total is not None:
+        line += f" in {total:.2f}s"
+    return line
+
+def format_summary(report, total=None, slowest=10):
+    """Short version of the report for the log channel: totals, failures and the slowest cogs."""
+    lines = [format_totals(report, total)]
+    failures = [row for row in report if row["error"]]
+    if failures:
+        lines.append("")
+        lines.append("Failed:")
+        lines.extend(f"  {row['cog']}: {row['error']}" for row in failures)
+
+    timed = [row for row in report if not row["error"]]
+    timed.sort(key=lambda row: (row["import"] or 0) + (row["setup"] or 0), reverse=True)
+    if timed:
+        lines.append("")
+        lines.append("Slowest:")
+        lines.extend(f"  {row['cog']}: import {format_ms(row['import'])}, setup {format_ms(row['setup'])}" for row in timed[:slowest])
+
+    summary = "\n".join(lines)
+    if len(summary) > 1990:
+        summary = summary[:1987] + "..."
+    return f"```\n{summary}\n```"
@@ -0,0 +1,52 @@
+# /bot/utils/command_sync.py
+import hashlib
+import json
+import os
+
+SYNC_STATE_FILE = os.path.join("DataBase", "command_sync.json")
+
+def tree_fingerprint(tree):
+    """Stable hash of the global command tree, exactly as it would be sent to Discord."""
+    payload = [command.to_dict(tree) for command in tree.get_commands()]
+    payload.sort(key=lambda command: (command.get("type", 1), command["name"]))
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class CommandSync:
+    """Syncs the global command tree only when it changed since the last successful sync.
+
+    The fingerprint of the last synced tree is kept per application id in `DataBase/command_sync.json`,
+    so restarts with unchanged commands skip the rate-limited sync call.
+    """
+
+    def __init__(self, bot, state_file=SYNC_STATE_FILE):
+        self.bot = bot
+        self.state_file = state_file
+
+    def load_state(self):
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_state(self, state):
+        with open(self.state_file, "w", encoding="utf-8") as file:
+            json.dump(state, file, indent=4)
+
+    async def sync(self, force=False):
+        """Sync global commands if the tree changed (or if forced).
+
+        Returns the list of synced commands, or None if the sync was skipped because nothing changed.
+        """
+        fingerprint = tree_fingerprint(self.bot.tree)
+        application_id = str(self.bot.application_id)
+        state = self.load_state()
+
+        if not force and state.get(application_id) == fingerprint:
+            return None
+
+        synced = await self.bot.tree.sync(guild=None)  # `guild=None` syncs globally
+        state[application_id] = fingerprint
+        self.save_state(state)
+        return synced
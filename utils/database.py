@@ -0,0 +1,47 @@
+# /bot/utils/database.py
+import os
+from pymongo import AsyncMongoClient
+from dotenv import load_dotenv
+from utils.metrics import MongoMetrics
+
+# Load environment variables from .env file
+load_dotenv()
+MONGODB_URI = os.getenv("MONGODB_URI")
+DATABASE_NAME = "Slavie"
+
+class Database:
+    """One async MongoDB connection pool shared by every cog through `bot.db`."""
+
+    def __init__(self, uri=MONGODB_URI, name=DATABASE_NAME, max_pool_size=50):
+        self.uri = uri
+        self.name = name
+        self.max_pool_size = max_pool_size
+        self.client = None
+        self.db = None
+
+    async def connect(self):
+        """Open the connection pool. Called once from main.py before the cogs are loaded."""
+        if self.client is not None:
+            return
+        # MongoMetrics times every round trip for the "mongo" external call metrics
+        self.client = AsyncMongoClient(self.uri, maxPoolSize=self.max_pool_size, event_listeners=[MongoMetrics()])
+        self.db = self.client[self.name]
+        await self.client.aconnect()
+
+    async def close(self):
+        """Close the connection pool."""
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+            self.db = None
+
+    def __getitem__(self, collection_name):
+        if self.db is None:
+            raise RuntimeError("The database is not connected yet.")
+        return self.db[collection_name]
+
+    def __getattr__(self, collection_name):
+        # Only reached for names that aren't real attributes, e.g. `bot.db.warn_data`
+        if collection_name.startswith("_"):
+            raise AttributeError(collection_name)
+        return self[collection_name]
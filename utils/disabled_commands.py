@@ -0,0 +1,83 @@
+# /bot/utils/disabled_commands.py
+import asyncio
+import discord
+from discord import app_commands
+from pymongo.errors import PyMongoError
+
+class DisabledCommands:
+    """In-memory copy of the `disabled_commands` collection, keyed by guild id."""
+
+    def __init__(self, db):
+        self.db = db
+        self.guilds = {}      # guild_id (str) -> set of disabled command names
+        self.doc_guilds = {}  # document _id -> guild_id, so deletes from the change stream can be resolved
+        self.watch_task = None
+
+    async def warm(self):
+        """Load every guild's disabled commands. Called once at startup."""
+        guilds, doc_guilds = {}, {}
+        async for doc in self.db.disabled_commands.find({}):
+            guilds[doc["guild_id"]] = set(doc.get("commands", []))
+            doc_guilds[doc["_id"]] = doc["guild_id"]
+        self.guilds, self.doc_guilds = guilds, doc_guilds
+
+    def is_disabled(self, guild_id, command_name):
+        """Check if a command is disabled for a specific guild."""
+        disabled = self.guilds.get(str(guild_id))
+        return bool(disabled) and command_name in disabled
+
+    def get_commands(self, guild_id):
+        """Return a copy of the disabled commands for a guild."""
+        return set(self.guilds.get(str(guild_id), ()))
+
+    def set_commands(self, guild_id, commands):
+        """Replace the cached disabled commands for a guild (call after writing to MongoDB)."""
+        if commands:
+            self.guilds[str(guild_id)] = set(commands)
+        else:
+            self.guilds.pop(str(guild_id), None)
+
+    def start_watching(self):
+        """Follow the collection's change stream so other bot processes' /disable and /enable show up here too."""
+        if self.watch_task is None or self.watch_task.done():
+            self.watch_task = asyncio.create_task(self.watch())
+
+    async def watch(self):
+        try:
+            async with await self.db.disabled_commands.watch(full_document="updateLookup") as stream:
+                async for change in stream:
+                    self.apply_change(change)
+        except asyncio.CancelledError:
+            raise
+        except PyMongoError as e:
+            # Change streams need a replica set; a standalone server just keeps the local cache
+            print(f"Not watching disabled commands for changes: {e}")
+
+    def apply_change(self, change):
+        doc_id = change["documentKey"]["_id"]
+        if change["operationType"] == "delete":
+            guild_id = self.doc_guilds.pop(doc_id, None)
+            if guild_id is not None:
+                self.guilds.pop(guild_id, None)
+            return
+        doc = change.get("fullDocument")
+        if doc:
+            self.doc_guilds[doc_id] = doc["guild_id"]
+            self.set_commands(doc["guild_id"], doc.get("commands", []))
+
+    def stop_watching(self):
+        if self.watch_task is not None:
+            self.watch_task.cancel()
+            self.watch_task = None
+
+# Custom check function to disable commands
+def check_if_disabled():
+    async def predicate(interaction: discord.Interaction) -> bool:
+        if interaction.guild is None:
+            return True
+        command_name = interaction.command.name
+        if interaction.client.disabled_commands.is_disabled(interaction.guild.id, command_name):
+            await interaction.response.send_message(f"The command `{command_name}` is disabled in this server.", ephemeral=True)
+            return False  # Prevents the slash command from executing
+        return True
+    return app_commands.check(predicate)
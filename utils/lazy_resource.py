@@ -0,0 +1,76 @@
+# /bot/utils/lazy_resource.py
+import asyncio
+import gc
+import time
+
+class LazyResource:
+    """A heavy resource (model, client, ...) that is only built when a command first needs it.
+
+    `loader` is a plain function that does the slow work (imports included) and returns the resource;
+    it runs in a worker thread so the event loop keeps going. `unloader` is an optional function run
+    after the resource has been dropped, e.g. to free GPU memory. With `idle_timeout` (seconds) the
+    resource is dropped after it hasn't been used for that long.
+    """
+
+    def __init__(self, name, loader, unloader=None, idle_timeout=None):
+        self.name = name
+        self.loader = loader
+        self.unloader = unloader
+        self.idle_timeout = idle_timeout
+        self.value = None
+        self.loaded = False
+        self.last_used = 0.0
+        self.lock = asyncio.Lock()
+        self.idle_task = None
+
+    async def get(self):
+        """Return the resource, loading it first if needed."""
+        if not self.loaded:
+            async with self.lock:
+                if not self.loaded:
+                    start = time.perf_counter()
+                    self.value = await asyncio.to_thread(self.loader)
+                    self.loaded = True
+                    print(f"Loaded {self.name} in {time.perf_counter() - start:.2f}s")
+                    self.start_idle_timer()
+        self.last_used = time.monotonic()
+        return self.value
+
+    def warm_up(self):
+        """Load the resource in the background, e.g. after on_ready."""
+        task = asyncio.create_task(self.get())
+        task.add_done_callback(self.report_warm_up)
+        return task
+
+    def report_warm_up(self, task):
+        if not task.cancelled() and task.exception():
+            print(f"Failed to warm up {self.name}: {task.exception()}")
+
+    def start_idle_timer(self):
+        if self.idle_timeout and (self.idle_task is None or self.idle_task.done()):
+            self.idle_task = asyncio.create_task(self.unload_when_idle())
+
+    async def unload_when_idle(self):
+        while self.loaded:
+            idle_for = time.monotonic() - self.last_used
+            if idle_for >= self.idle_timeout:
+                await self.unload()
+                return
+            await asyncio.sleep(max(self.idle_timeout - idle_for, 1))
+
+    async def unload(self):
+        """Drop the resource; the next get() loads it again."""
+        async with self.lock:
+            if not self.loaded:
+                return
+            self.value, self.loaded = None, False
+            gc.collect()
+            if self.unloader:
+                await asyncio.to_thread(self.unloader)
+            print(f"Unloaded {self.name}")
+
+    def close(self):
+        """Stop the idle timer, e.g. from cog_unload."""
+        if self.idle_task is not None:
+            self.idle_task.cancel()
+            self.idle_task = None
@@ -0,0 +1,172 @@
+# /bot/utils/log_sink.py
+import asyncio
+import logging
+import os
+from logging.handlers import RotatingFileHandler
+import discord
+
+MESSAGE_LIMIT = 2000       # Characters per Discord message
+EMBEDS_PER_MESSAGE = 10    # Embeds per Discord message
+EMBED_CHARS_PER_MESSAGE = 6000
+CODE_BLOCK_OVERHEAD = len("```\n\n```")
+
+def embed_to_text(embed):
+    """Plain-text version of an embed for the log file."""
+    parts = [part for part in (embed.author.name, embed.title, embed.description) if part]
+    parts.extend(f"{field.name}: {field.value}" for field in embed.fields)
+    if embed.footer.text:
+        parts.append(embed.footer.text)
+    return " | ".join(part.replace("\n", " ") for part in parts)
+
+def strip_code_block(text):
+    """Lines that already are a code block are unwrapped, they get merged into the sink's own code blocks."""
+    if text.startswith("```") and text.endswith("```") and len(text) >= 6:
+        text = text[3:-3]
+        first_line, _, rest = text.partition("\n")
+        # Drop a language tag like ```py
+        if rest and first_line.strip().isalnum():
+            text = rest
+    return text.strip("\n")
+
+def chunk_lines(lines, limit=MESSAGE_LIMIT - CODE_BLOCK_OVERHEAD):
+    """Join lines into as few chunks of at most `limit` characters as possible, splitting lines that are too long."""
+    chunks, current = [], ""
+    for line in lines:
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if current and len(current) + 1 + len(line) > limit:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        chunks.append(current)
+    return chunks
+
+def chunk_embeds(embeds):
+    """Group embeds so each message stays within Discord's embed count and total size limits."""
+    groups, current, size = [], [], 0
+    for embed in embeds:
+        embed_size = len(embed)
+        if current and (len(current) == EMBEDS_PER_MESSAGE or size + embed_size > EMBED_CHARS_PER_MESSAGE):
+            groups.append(current)
+            current, size = [], 0
+        current.append(embed)
+        size += embed_size
+    if current:
+        groups.append(current)
+    return groups
+
+class ChannelLogSink:
+    """Buffered logger for the bot's log channel.
+
+    `log()` only puts the message on a bounded queue and writes it to a rotating local file, it never
+    waits for Discord. A background task collects everything queued during `flush_interval` seconds and
+    sends text lines merged into code blocks and embeds grouped into as few messages as the limits allow.
+
+    When the queue is full, `drop_policy` decides what is lost: "oldest" drops the oldest queued message,
+    "newest" drops the incoming one. Dropped, sent and failed messages are counted in `stats`.
+    """
+
+    def __init__(self, bot, channel_id, max_queue=1000, flush_interval=2.0, drop_policy="oldest",
+                 log_file="logs/bot.log", max_bytes=1_000_000, backup_count=5):
+        if drop_policy not in ("oldest", "newest"):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.bot = bot
+        self.channel_id = channel_id
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self.task = None
+        self.stats = {"queued": 0, "dropped": 0, "sent_messages": 0, "sent_items": 0, "failed": 0}
+
+        self.file_logger = None
+        if log_file:
+            os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+            handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.file_logger = logging.getLogger(f"{__name__}.{channel_id}")
+            self.file_logger.setLevel(logging.INFO)
+            self.file_logger.propagate = False
+            self.file_logger.addHandler(handler)
+
+    def log(self, message):
+        """Queue a string or Embed for the log channel. Never blocks."""
+        if self.file_logger:
+            self.file_logger.info(embed_to_text(message) if isinstance(message, discord.Embed) else str(message))
+
+        if self.queue.full():
+            self.stats["dropped"] += 1
+            if self.drop_policy == "newest":
+                return
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+        self.stats["queued"] += 1
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the flusher, sending whatever is still queued if the channel is reachable."""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if not self.queue.empty() and not self.bot.is_closed():
+            await self.flush(self.drain())
+
+    def drain(self):
+        items = []
+        while not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+    async def run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            first = await self.queue.get()
+            # Give bursts a moment to pile up so they go out as one message
+            await asyncio.sleep(self.flush_interval)
+            await self.flush([first] + self.drain())
+
+    async def flush(self, items):
+        channel = self.bot.get_channel(self.channel_id)
+        if channel is None:
+            self.stats["failed"] += len(items)
+            print(f"Log channel {self.channel_id} not found, dropped {len(items)} log messages")
+            return
+
+        # Keep the original order, but merge each run of text lines / embeds
+        batches = []
+        for item in items:
+            kind = "embed" if isinstance(item, discord.Embed) else "text"
+            if batches and batches[-1][0] == kind:
+                batches[-1][1].append(item)
+            else:
+                batches.append((kind, [item]))
+
+        for kind, batch in batches:
+            if kind == "text":
+                lines = [strip_code_block(str(line)) for line in batch]
+                for index, chunk in enumerate(chunk_lines(lines)):
+                    # Count the lines once, on the first chunk they went out in
+                    await self.send(channel, len(batch) if index == 0 else 0, content=f"```\n{chunk}\n```")
+            else:
+                for group in chunk_embeds(batch):
+                    await self.send(channel, len(group), embeds=group)
+
+    async def send(self, channel, count, **kwargs):
+        try:
+            await channel.send(**kwargs)
+            self.stats["sent_messages"] += 1
+            self.stats["sent_items"] += count
+        except Exception as e:
+            self.stats["failed"] += count
+            print(f"Failed to send log to channel: {e}")
@@ -0,0 +1,133 @@
+# /bot/utils/loop_watchdog.py
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+COGS_DIR = os.path.abspath("cogs")
+
+def find_culprit(frame):
+    """Walk the stack from the innermost frame outwards and return (file, qualified function) of the first cog frame."""
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(COGS_DIR + os.sep):
+            code = frame.f_code
+            return os.path.relpath(filename), getattr(code, "co_qualname", code.co_name)
+        frame = frame.f_back
+    return None, None
+
+class LoopWatchdog:
+    """Detects when something blocks the event loop and records what it was.
+
+    A heartbeat task sleeps `interval` seconds in a loop and measures how late it wakes up (the loop lag).
+    A monitor thread notices when the heartbeat is overdue by more than `threshold` seconds, grabs the
+    stack of the event loop thread right then and finds the cog function on it. Once the loop is free again
+    the stall is recorded with its full duration in `stalls` (the last `history` entries) and in a rotating
+    log file.
+    """
+
+    def __init__(self, threshold=0.25, interval=0.05, history=100, log_file="logs/loop_stalls.log"):
+        if threshold <= interval:
+            raise ValueError("The stall threshold has to be longer than the heartbeat interval")
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = deque(maxlen=history)
+        self.total_stalls = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.last_beat = time.monotonic()
+        self.captured_beat = None   # last_beat value the pending capture belongs to
+        self.pending = None         # (cog file, function, stack) grabbed by the monitor thread during the current stall
+        self.loop_thread_id = None
+        self.task = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+        self.file_logger = None
+        if log_file:
+            os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+            handler = RotatingFileHandler(log_file, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.file_logger = logging.getLogger(__name__)
+            self.file_logger.setLevel(logging.INFO)
+            self.file_logger.propagate = False
+            self.file_logger.addHandler(handler)
+
+    def start(self):
+        """Start watching the running event loop. Call from inside the loop."""
+        if self.task is not None and not self.task.done():
+            return
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.stop_event.clear()
+        self.task = asyncio.create_task(self.heartbeat())
+        self.thread = threading.Thread(target=self.monitor, name="loop-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def heartbeat(self):
+        while True:
+            beat = self.last_beat
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.lag = max(now - started - self.interval, 0.0)
+            self.max_lag = max(self.max_lag, self.lag)
+            self.last_beat = now
+            # Same test as the monitor thread, so every capture it takes is either recorded or dropped here
+            if now - beat > self.threshold:
+                self.record(self.lag, beat)
+            elif self.captured_beat == beat:
+                self.pending = None
+
+    def monitor(self):
+        while not self.stop_event.wait(self.interval):
+            beat = self.last_beat
+            if time.monotonic() - beat > self.threshold and self.captured_beat != beat:
+                frame = sys._current_frames().get(self.loop_thread_id)
+                if frame is not None:
+                    self.pending = find_culprit(frame) + (traceback.format_stack(frame),)
+                    self.captured_beat = beat
+                del frame
+
+    def record(self, duration, beat=None):
+        pending, self.pending = self.pending, None
+        if beat is not None and self.captured_beat != beat:
+            pending = None  # Taken during an earlier stall
+        # None if the monitor thread didn't get to look (e.g. it was starved itself)
+        culprit, function, stack = pending or (None, None, [])
+
+        stall = {
+            "when": datetime.now(timezone.utc),
+            "duration": duration,
+            "cog": culprit,
+            "function": function,
+            "stack": stack,
+        }
+        self.stalls.append(stall)
+        self.total_stalls += 1
+
+        where = f"{culprit}:{function}" if culprit else "unknown (not in a cog)"
+        print(f"Event loop blocked for {duration * 1000:.0f} ms in {where}")
+        if self.file_logger:
+            self.file_logger.info(f"blocked {duration * 1000:.0f} ms in {where}\n{''.join(stack)}")
+
+    def summary(self, limit=10):
+        """Stalls grouped by where they happened, worst total first."""
+        grouped = {}
+        for stall in self.stalls:
+            key = f"{stall['cog']}:{stall['function']}" if stall["cog"] else "unknown"
+            count, total, worst = grouped.get(key, (0, 0.0, 0.0))
+            grouped[key] = (count + 1, total + stall["duration"], max(worst, stall["duration"]))
+        return sorted(grouped.items(), key=lambda item: item[1][1], reverse=True)[:limit]
@@ -0,0 +1,225 @@
+# /bot/utils/metrics.py
+import threading
+import time
+from contextlib import contextmanager
+import discord
+from discord import app_commands
+from pymongo import monitoring
+
+# Histogram buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+DESCRIPTIONS = {
+    "slavie_command_invocations_total": ("counter", "Slash command invocations that finished without an error."),
+    "slavie_command_errors_total": ("counter", "Slash command invocations that raised an error or failed a check."),
+    "slavie_command_handler_seconds": ("histogram", "Time from the command handler starting (usually the defer) to it returning."),
+    "slavie_command_total_seconds": ("histogram", "Time from Discord creating the interaction to the command handler returning."),
+    "slavie_external_call_seconds": ("histogram", "Duration of calls to external services."),
+    "slavie_external_call_errors_total": ("counter", "Calls to external services that raised an error."),
+}
+
+def guild_bucket(guild):
+    """Coarse guild size label, so metrics don't get one series per guild."""
+    if guild is None:
+        return "dm"
+    members = guild.member_count or 0
+    if members < 100:
+        return "small"
+    if members < 1000:
+        return "medium"
+    if members < 10000:
+        return "large"
+    return "huge"
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Approximate quantile: the upper bound of the bucket it falls in."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+class Metrics:
+    """Counters and histograms kept in memory and rendered in the Prometheus text format.
+
+    Safe to use from worker threads (yt-dlp, Tenor requests) as well as from the event loop.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> Histogram
+
+    def inc(self, name, labels=None, amount=1):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, labels=None):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, service):
+        """Time a call to an external service: `with metrics.timer("tenor"): ...`"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc("slavie_external_call_errors_total", {"service": service})
+            raise
+        finally:
+            self.observe("slavie_external_call_seconds", time.perf_counter() - start, {"service": service})
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+            histograms = [(key, list(h.buckets), list(h.counts), h.sum, h.count) for key, h in histograms]
+
+        lines, described = [], set()
+
+        def describe(name):
+            if name not in described and name in DESCRIPTIONS:
+                kind, text = DESCRIPTIONS[name]
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+                described.add(name)
+
+        for (name, labels), value in counters:
+            describe(name)
+            lines.append(f"{name}{format_labels(labels)} {value}")
+
+        for (name, labels), buckets, counts, total, count in histograms:
+            describe(name)
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + ["+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {total}")
+            lines.append(f"{name}_count{format_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def command_summary(self):
+        """Per command: (calls, errors, handler histogram) with all guild buckets merged."""
+        summary = {}
+        with self.lock:
+            for (name, labels), value in self.counters.items():
+                labels = dict(labels)
+                if name == "slavie_command_invocations_total":
+                    summary.setdefault(labels["command"], [0, 0, Histogram()])[0] += value
+                elif name == "slavie_command_errors_total":
+                    summary.setdefault(labels["command"], [0, 0, Histogram()])[1] += value
+            for (name, labels), histogram in self.histograms.items():
+                if name == "slavie_command_handler_seconds":
+                    merged = summary.setdefault(dict(labels)["command"], [0, 0, Histogram()])[2]
+                    merge_histogram(merged, histogram)
+        return summary
+
+    def external_summary(self):
+        """Per external service: (histogram, errors)."""
+        summary = {}
+        with self.lock:
+            for (name, labels), histogram in self.histograms.items():
+                if name == "slavie_external_call_seconds":
+                    merge_histogram(summary.setdefault(dict(labels)["service"], [Histogram(), 0])[0], histogram)
+            for (name, labels), value in self.counters.items():
+                if name == "slavie_external_call_errors_total":
+                    summary.setdefault(dict(labels)["service"], [Histogram(), 0])[1] += value
+        return summary
+
+def merge_histogram(into, histogram):
+    into.counts = [a + b for a, b in zip(into.counts, histogram.counts)]
+    into.sum += histogram.sum
+    into.count += histogram.count
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels) + "}"
+
+# Shared by the whole bot
+metrics = Metrics()
+
+class MetricsCommandTree(app_commands.CommandTree):
+    """Command tree that records invocation counts, errors and latency for every slash command."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["metrics_started"] = time.perf_counter()
+        return True
+
+    def record(self, interaction, command_name, error=None):
+        labels = {"command": command_name, "guild_bucket": guild_bucket(interaction.guild)}
+        if error is None:
+            metrics.inc("slavie_command_invocations_total", labels)
+        else:
+            metrics.inc("slavie_command_errors_total", {**labels, "error": type(error).__name__})
+
+        started = interaction.extras.get("metrics_started")
+        if started is not None:
+            metrics.observe("slavie_command_handler_seconds", time.perf_counter() - started, labels)
+        total = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        metrics.observe("slavie_command_total_seconds", max(total, 0.0), labels)
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError) -> None:
+        command = interaction.command
+        original = error.original if isinstance(error, app_commands.CommandInvokeError) else error
+        self.record(interaction, command.qualified_name if command else "unknown", original)
+        await super().on_error(interaction, error)
+
+class MongoMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding Mongo round trips into the external call metrics."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        metrics.observe("slavie_external_call_seconds", event.duration_micros / 1_000_000, {"service": "mongo"})
+
+    def failed(self, event):
+        metrics.observe("slavie_external_call_seconds", event.duration_micros / 1_000_000, {"service": "mongo"})
+        metrics.inc("slavie_external_call_errors_total", {"service": "mongo"})
+
+async def start_metrics_server(host="127.0.0.1", port=9108):
+    """Serve `GET /metrics` in the Prometheus text format. Returns the runner, call `await runner.cleanup()` to stop."""
+    from aiohttp import web
+
+    async def handle(request):
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
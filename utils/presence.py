@@ -0,0 +1,79 @@
+# /bot/utils/presence.py
+import time
+import discord
+from discord.ext import tasks
+
+def format_uptime(seconds):
+    """Short uptime like `2d 3h`, `5h 12m` or `12m`."""
+    minutes, _ = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+def active_queue_count(bot):
+    """Number of servers currently playing music or with songs queued."""
+    play_cog = bot.get_cog("Play")
+    if play_cog is None:
+        return 0
+    return sum(1 for player in play_cog.players.values() if player.is_active or player.queue)
+
+class PresenceScheduler:
+    """Rotates the bot's presence through a list of templated activities.
+
+    `activities` is a list of (discord.ActivityType, template) pairs. Templates can use `{guilds}`,
+    `{queues}` and `{uptime}`, plus anything registered with `add_placeholder`. A presence update is
+    only sent when the rendered activity differs from the one currently shown.
+    """
+
+    def __init__(self, bot, activities, interval=60):
+        self.bot = bot
+        self.activities = list(activities)
+        self.started_at = time.monotonic()
+        self.index = 0
+        self.current = None  # (type, name) currently shown
+        self.placeholders = {
+            "guilds": lambda bot: len(bot.guilds),
+            "queues": active_queue_count,
+            "uptime": lambda bot: format_uptime(time.monotonic() - self.started_at),
+        }
+        self.rotate = tasks.loop(seconds=interval)(self.tick)
+        self.rotate.before_loop(self.bot.wait_until_ready)
+
+    def add_placeholder(self, name, func):
+        """Register `{name}` for templates; `func(bot)` returns its value."""
+        self.placeholders[name] = func
+
+    def render(self, template):
+        values = {name: func(self.bot) for name, func in self.placeholders.items() if f"{{{name}}}" in template}
+        return template.format(**values)
+
+    async def tick(self):
+        """Show the next activity, unless it renders the same as what is already shown."""
+        if not self.activities:
+            return
+        activity_type, template = self.activities[self.index % len(self.activities)]
+        self.index += 1
+        try:
+            name = self.render(template)
+        except (KeyError, IndexError, ValueError) as e:
+            print(f"Invalid status template {template!r}: {e}")
+            return
+
+        if (activity_type, name) == self.current:
+            return
+        await self.bot.change_presence(activity=discord.Activity(type=activity_type, name=name))
+        self.current = (activity_type, name)
+
+    def set_interval(self, seconds):
+        self.rotate.change_interval(seconds=seconds)
+
+    def start(self):
+        if not self.rotate.is_running():
+            self.rotate.start()
+
+    def stop(self):
+        self.rotate.cancel()
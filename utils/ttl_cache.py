@@ -0,0 +1,48 @@
+# /bot/utils/ttl_cache.py
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """Small in-memory LRU cache whose entries also expire after `ttl` seconds.
+
+    When full, the least recently used entry is evicted. `ttl=None` keeps entries until they're evicted.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires at or None, value)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires, value = entry
+        if expires is not None and expires <= time.monotonic():
+            del self.entries[key]
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        """Store a value. `ttl` overrides the cache's default for this entry."""
+        ttl = self.ttl if ttl is None else ttl
+        self.entries[key] = (time.monotonic() + ttl if ttl is not None else None, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self.entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)